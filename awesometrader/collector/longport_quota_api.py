@@ -1,8 +1,10 @@
 from __future__ import annotations
+import asyncio
 import pandas as pd
-from typing import List, Dict, Type, Optional, TYPE_CHECKING
+from typing import List, Dict, Tuple, Type, Optional, TYPE_CHECKING
 from loguru import logger
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from longport.openapi import (
     Period,
     AdjustType,
@@ -13,6 +15,7 @@ from longport.openapi import (
     QuoteContext,
     Config
 )
+from ..utils import Utils
 
 if TYPE_CHECKING:
     from longport.openapi import (
@@ -27,6 +30,13 @@ if TYPE_CHECKING:
     )
 
 class LongPortQuotaAPI:
+    # 历史K线接口单次请求返回的最大K线数量
+    HISTORY_MAX_CANDLES_PER_CALL = 1000
+    # 历史K线分片并发请求的最大线程数
+    HISTORY_MAX_WORKERS = 4
+    # 异步K线请求的默认最大并发数
+    CANDLESTICK_MAX_CONCURRENCY = 4
+
     def __init__(self):
         """初始化LongPortQuotaAPI类"""
         config = Config.from_env()
@@ -322,12 +332,124 @@ class LongPortQuotaAPI:
             logger.error(f"获取股票K线数据失败 {stock_code}: {e}")
             return pd.DataFrame()
 
+    async def get_stock_candlesticks_async(self, stock_code: str, period: Type[Period], count: int,
+                                           adjust_type: Type[AdjustType],
+                                           semaphore: Optional[asyncio.Semaphore] = None) -> pd.DataFrame:
+        """
+        异步获取股票K线数据
+        LongPort SDK只提供同步接口，这里将同步请求放到线程中执行，便于用asyncio.gather并发获取多组K线
+        
+        :param stock_code: 股票代码，使用 ticker.region 格式，例如：'700.HK'
+        :param period: K线周期，使用Period枚举，例如：Period.Day, Period.Min_5等
+        :param count: 数据数量，最大为1000
+        :param adjust_type: 复权类型，使用AdjustType枚举，例如：AdjustType.NoAdjust
+        :param semaphore: 可选的信号量，用于限制同时发出的请求数，默认不限制
+        :return: K线数据DataFrame，包含Open, High, Low, Close, Volume, Turnover列
+        """
+        if semaphore is None:
+            return await asyncio.to_thread(self.get_stock_candlesticks, stock_code, period, count, adjust_type)
+        async with semaphore:
+            return await asyncio.to_thread(self.get_stock_candlesticks, stock_code, period, count, adjust_type)
+
+    def _split_history_range(self, period: Type[Period], start_date: datetime,
+                             end_date: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        按单次请求的K线数量上限把日期范围切分为互不重叠的分片
+
+        :param period: K线周期
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 分片列表，每个元素为 (分片开始时间, 分片结束时间)
+        """
+        # 月/季/年按最短自然长度计算，保证分片内K线数量不超过单次请求上限
+        period_minutes = Utils.get_period_minutes(period)
+        if period_minutes is None:
+            return [(start_date, end_date)]
+
+        # 每个自然日最多 24*60/period_minutes 根K线，据此计算分片天数
+        window_days = max(1, self.HISTORY_MAX_CANDLES_PER_CALL * period_minutes // (24 * 60))
+
+        windows = []
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+            windows.append((window_start, window_end))
+            window_start = datetime.combine(window_end.date() + timedelta(days=1), datetime.min.time())
+        return windows
+
+    def _fetch_history_range(self, stock_code: str, period: Type[Period], adjust_type: Type[AdjustType],
+                             start_date: datetime, end_date: datetime) -> List[pd.DataFrame]:
+        """
+        从结束日期向前分页获取一个日期范围内的历史K线
+
+        :param stock_code: 股票代码，使用 ticker.region 格式，例如：'700.HK'
+        :param period: K线周期
+        :param adjust_type: 复权类型
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 各分页数据的DataFrame列表
+        """
+        data_frames = []
+        current_end_date = end_date
+
+        while True:
+            # 调用API获取历史数据
+            response = self.quote_ctx.history_candlesticks_by_date(
+                symbol=stock_code,
+                period=period,
+                adjust_type=adjust_type,
+                start=start_date.date(),
+                end=current_end_date.date(),
+                trade_sessions=TradeSessions.All
+            )
+
+            num_candles = len(response)
+            if num_candles == 0:
+                break
+
+            # 转换为DataFrame
+            data_list = []
+            for candle in response:
+                data_list.append({
+                    'timestamp': candle.timestamp,
+                    'Open': candle.open,
+                    'High': candle.high,
+                    'Low': candle.low,
+                    'Close': candle.close,
+                    'Volume': candle.volume,
+                    'Turnover': candle.turnover
+                })
+
+            # 创建DataFrame
+            df_chunk = pd.DataFrame(data_list)
+            df_chunk.set_index('timestamp', inplace=True)
+            df_chunk.sort_index(inplace=True)
+            data_frames.append(df_chunk)
+
+            logger.info(f"获取数据块: {len(df_chunk)} 条记录，时间范围: {df_chunk.index[0]} 到 {df_chunk.index[-1]}")
+
+            # 如果已经覆盖了请求的开始时间，说明已经获取完毕
+            # 返回数量不足单次上限时，分片内更早的数据也已全部返回，不再额外发一次探测请求
+            earliest_timestamp = df_chunk.index[0]
+            if (num_candles < self.HISTORY_MAX_CANDLES_PER_CALL
+                    or earliest_timestamp <= start_date or earliest_timestamp >= current_end_date):
+                logger.info(f"已到达请求的开始时间，停止继续请求")
+                break
+
+            # 更新下次请求的结束时间为当前数据块的最早时间
+            current_end_date = earliest_timestamp
+            logger.info(f"需要继续获取更早的数据，下次请求截止时间: {current_end_date}")
+
+        return data_frames
+
     def get_stock_history(self, stock_code: str, period: Type[Period], adjust_type: Type[AdjustType],
                          start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """
         获取股票历史K线数据
         根据LongPort API文档: https://open.longportapp.com/zh-CN/docs/quote/pull/history-candlestick
         
+        日期范围会按单次请求的K线数量上限切分为多个分片，各分片并发请求后再合并
+        
         :param stock_code: 股票代码，使用 ticker.region 格式，例如：'700.HK'
         :param period: K线周期，使用Period枚举，例如：Period.Day, Period.Min_5等
         :param adjust_type: 复权类型，使用AdjustType枚举，例如：AdjustType.NoAdjust
@@ -339,55 +461,20 @@ class LongPortQuotaAPI:
             logger.info(f"正在获取股票历史数据: {stock_code}, period={period}, adjust_type={adjust_type}")
             logger.info(f"日期范围: {start_date.date()} 到 {end_date.date()}")
             
+            windows = self._split_history_range(period, start_date, end_date)
+            logger.info(f"日期范围切分为 {len(windows)} 个分片并发获取")
+            
             # 存储所有分片的数据
             all_data_frames = []
-            current_end_date = end_date
-            
-            while True:
-                # 调用API获取历史数据
-                response = self.quote_ctx.history_candlesticks_by_date(
-                    symbol=stock_code,
-                    period=period,
-                    adjust_type=adjust_type,
-                    start=start_date.date(),
-                    end=current_end_date.date(),
-                    trade_sessions=TradeSessions.All
-                )
-
-                num_candles = len(response)
-                if num_candles== 0:
-                    break
-                
-                # 转换为DataFrame
-                data_list = []
-                for candle in response:
-                    data_list.append({
-                        'timestamp': candle.timestamp,
-                        'Open': candle.open,
-                        'High': candle.high,
-                        'Low': candle.low,
-                        'Close': candle.close,
-                        'Volume': candle.volume,
-                        'Turnover': candle.turnover
-                    })
-                
-                # 创建DataFrame
-                df_chunk = pd.DataFrame(data_list)
-                df_chunk.set_index('timestamp', inplace=True)
-                df_chunk.sort_index(inplace=True)
-                all_data_frames.append(df_chunk)
-
-                logger.info(f"获取数据块: {len(df_chunk)} 条记录，时间范围: {df_chunk.index[0]} 到 {df_chunk.index[-1]}")
-                
-                # 如果已经覆盖了请求的开始时间，说明已经获取完毕
-                earliest_timestamp = df_chunk.index[0]
-                if earliest_timestamp <= start_date or earliest_timestamp >= current_end_date:
-                    logger.info(f"已到达请求的开始时间，停止继续请求")
-                    break
-                
-                # 更新下次请求的结束时间为当前数据块的最早时间
-                current_end_date = earliest_timestamp
-                logger.info(f"需要继续获取更早的数据，下次请求截止时间: {current_end_date}")
+            max_workers = min(self.HISTORY_MAX_WORKERS, len(windows))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._fetch_history_range, stock_code, period, adjust_type,
+                                    window_start, window_end)
+                    for window_start, window_end in windows
+                ]
+                for future in futures:
+                    all_data_frames.extend(future.result())
             
             # 合并所有数据块
             if not all_data_frames:
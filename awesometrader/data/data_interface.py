@@ -1,16 +1,58 @@
+import os
+import shutil
+import functools
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import List, Dict, Tuple, Type
+from typing import List, Dict, Tuple, Type, Optional
 from loguru import logger
 from datetime import datetime
 from longport.openapi import Period
 from ..utils import Utils
 
+
+@functools.lru_cache(maxsize=32)
+def _load_pool_cached(path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """
+    读取股票池文件并缓存结果，文件修改时间作为缓存键的一部分，文件变更后自动失效
+    :param path: 股票池文件路径
+    :param mtime_ns: 文件修改时间（纳秒）
+    :return: 股票代码元组
+    """
+    # 读取CSV时将股票代码列作为字符串类型，避免丢失前导0
+    df = pd.read_csv(path, dtype={'stock_code': str, 'code': str})
+    # 按优先级顺序查找股票代码列
+    if 'stock_code' in df.columns:
+        stock_codes = df['stock_code'].tolist()
+    elif 'code' in df.columns:
+        stock_codes = df['code'].tolist()
+    else:
+        # 默认使用第一列
+        stock_codes = df.iloc[:, 0].astype(str).tolist()
+    
+    # 过滤掉空值，确保转换为字符串
+    return tuple(str(code).strip() for code in stock_codes if pd.notna(code) and str(code).strip())
+
+
 class DataInterface:
+    # parquet缓存按年份做Hive分区（<周期>.parquet/year=2024/part-0.parquet），索引列统一保存为timestamp
+    PARQUET_INDEX_COLUMN = 'timestamp'
+    PARQUET_PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive')
+    # 分批写入parquet时每个RecordBatch的最大行数
+    PARQUET_BATCH_ROWS = 64_000
+
     def __init__(self):
         """初始化DataInterface类"""
         # 使用工具类获取缓存目录
         self.cache_dir = Utils.get_cache_dir()
+        # parquet读写共用一个Arrow内存池，优先使用jemalloc（按倍数扩容），不可用时退回默认内存池
+        try:
+            self.memory_pool = pa.jemalloc_memory_pool()
+        except NotImplementedError:
+            self.memory_pool = pa.default_memory_pool()
         logger.info(f"DataInterface初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"项目根目录: {Utils.get_project_root()}")
         
@@ -29,13 +71,8 @@ class DataInterface:
         stock_dir = stock_base_dir / stock_code
         stock_dir.mkdir(parents=True, exist_ok=True)
         
-        # 统一使用周期名称作为文件名
-        # Period不是标准枚举，通过repr获取名称然后提取周期部分
-        period_repr = repr(period)  # 例如: "Period.Day" 或 "Period.Min_1"
-        if '.' in period_repr:
-            period_name = period_repr.split('.', 1)[1].lower()  # "Period.Day" -> "day"
-        else:
-            period_name = period_repr.lower()  # 备用方案
+        # 统一使用周期名称作为文件名，例如 Period.Day -> "day"
+        period_name = Utils.get_period_name(period).lower()
         
         # 根据文件格式设置扩展名
         if file_format.lower() == 'parquet':
@@ -54,6 +91,8 @@ class DataInterface:
         try:
             if input_path.suffix == '.csv':
                 df = pd.read_csv(input_path, index_col=0, parse_dates=True)
+            elif input_path.suffix == '.parquet' and input_path.is_dir():
+                df = self.get_df_from_dataset(dataset_dir=input_path)
             elif input_path.suffix == '.parquet':
                 df = pd.read_parquet(input_path)
                 df.index = pd.to_datetime(df.index)
@@ -85,7 +124,7 @@ class DataInterface:
             elif file_format == 'parquet':
                 if not file_path.suffix:
                     file_path = file_path.with_suffix('.parquet')
-                df.to_parquet(file_path)
+                df.to_parquet(file_path, engine='pyarrow', compression='snappy', index=True)
             else:
                 raise ValueError(f"不支持的文件格式: {file_format}")
                 
@@ -95,6 +134,98 @@ class DataInterface:
             logger.error(f"保存文件失败: {e}")
             return False
 
+    def get_df_from_dataset(self, dataset_dir: Path, start_date: datetime = None,
+                            end_date: datetime = None) -> pd.DataFrame:
+        """
+        从按年份分区的parquet数据集中读取DataFrame，日期条件下推到分区和行组，只读取命中的数据
+        :param dataset_dir: 数据集目录
+        :param start_date: 开始日期，可选
+        :param end_date: 结束日期，可选
+        :return: DataFrame
+        """
+        try:
+            dataset = ds.dataset(dataset_dir, format='parquet', partitioning=self.PARQUET_PARTITIONING)
+            
+            # 先按年份裁剪分区，再按时间过滤行
+            ts_field = ds.field(self.PARQUET_INDEX_COLUMN)
+            filters = []
+            if start_date is not None:
+                start = pd.Timestamp(start_date)
+                filters.append(ds.field('year') >= start.year)
+                filters.append(ts_field >= pa.scalar(start.to_datetime64()))
+            if end_date is not None:
+                end = pd.Timestamp(end_date)
+                filters.append(ds.field('year') <= end.year)
+                filters.append(ts_field <= pa.scalar(end.to_datetime64()))
+            
+            expression = None
+            for condition in filters:
+                expression = condition if expression is None else expression & condition
+            
+            table = dataset.to_table(filter=expression, memory_pool=self.memory_pool)
+            df = table.to_pandas(memory_pool=self.memory_pool).drop(columns=['year'])
+            df = df.set_index(self.PARQUET_INDEX_COLUMN).sort_index()
+            df.index = pd.to_datetime(df.index)
+            return df
+        except Exception as e:
+            logger.error(f"读取数据集失败 {dataset_dir}: {e}")
+            return pd.DataFrame()
+
+    def save_df_to_dataset(self, df: pd.DataFrame, dataset_dir: str) -> bool:
+        """
+        将带时间索引的DataFrame保存为按年份分区的parquet数据集（覆盖写入）
+        :param df: 要保存的DataFrame，索引为时间
+        :param dataset_dir: 数据集目录
+        :return: 是否保存成功
+        """
+        dataset_dir = Path(dataset_dir)
+        # 先写入同级的临时目录，全部写完后再替换旧数据，转换或写入失败时不影响已有缓存
+        tmp_dir = dataset_dir.with_name(dataset_dir.name + '.tmp')
+        try:
+            # 按时间排序写入，行组的min/max统计才足够紧凑，读取时按日期过滤可以跳过整个行组
+            frame = df.rename_axis(self.PARQUET_INDEX_COLUMN).reset_index()
+            frame[self.PARQUET_INDEX_COLUMN] = pd.to_datetime(frame[self.PARQUET_INDEX_COLUMN])
+            frame = frame.sort_values(self.PARQUET_INDEX_COLUMN, kind='stable', ignore_index=True)
+            # 整表只转换一次Arrow，各年份分区按掩码切片，共用同一schema
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            years = frame[self.PARQUET_INDEX_COLUMN].dt.year.to_numpy()
+            
+            # 按年份逐个分区写入临时目录，每个分区用ParquetWriter分批写入，避免一次性编码整张表
+            # 进程崩溃时残留的临时目录先清理掉，避免旧的部分年份分区混进本次写入的数据集
+            self.remove_path(tmp_dir)
+            for year in sorted(set(years.tolist())):
+                partition_dir = tmp_dir / f"year={year}"
+                partition_dir.mkdir(parents=True, exist_ok=True)
+                year_table = pc.filter(table, pa.array(years == year), memory_pool=self.memory_pool)
+                with pq.ParquetWriter(partition_dir / 'part-0.parquet', table.schema,
+                                      compression='snappy', data_page_size=1 << 20,
+                                      sorting_columns=[pq.SortingColumn(0)],
+                                      memory_pool=self.memory_pool) as writer:
+                    for batch in year_table.to_batches(max_chunksize=self.PARQUET_BATCH_ROWS):
+                        writer.write_batch(batch)
+            
+            # 覆盖写入：清理旧数据集或旧的单文件缓存，避免残留过期的年份分区，再把临时目录换到正式位置
+            self.remove_path(dataset_dir)
+            os.replace(tmp_dir, dataset_dir)
+            
+            logger.success(f"数据集保存成功: {dataset_dir}")
+            return True
+        except Exception as e:
+            logger.error(f"保存数据集失败: {e}")
+            # 只清理本次写入的临时目录，已有缓存保持不变
+            self.remove_path(tmp_dir)
+            return False
+
+    def remove_path(self, path: Path) -> None:
+        """
+        删除数据文件或数据集目录，不存在时忽略
+        :param path: 文件或目录路径
+        """
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.exists():
+            path.unlink()
+
     # ==================== 股票池相关 ====================
     
     def load_stock_pool(self, stock_list_file: str) -> List[str]:
@@ -106,20 +237,8 @@ class DataInterface:
         try:
             stock_pool_path = self.cache_dir / stock_list_file
             if stock_pool_path.exists():
-                # 读取CSV时将股票代码列作为字符串类型，避免丢失前导0
-                df = pd.read_csv(stock_pool_path, dtype={'stock_code': str, 'code': str})
-                # 按优先级顺序查找股票代码列
-                if 'stock_code' in df.columns:
-                    stock_codes = df['stock_code'].tolist()
-                elif 'code' in df.columns:
-                    stock_codes = df['code'].tolist()
-                else:
-                    # 默认使用第一列
-                    stock_codes = df.iloc[:, 0].astype(str).tolist()
-                
-                # 过滤掉空值，确保转换为字符串
-                stock_codes = [str(code).strip() for code in stock_codes if pd.notna(code) and str(code).strip()]
-                
+                # 同一文件未修改时直接命中缓存，不再重复解析CSV
+                stock_codes = list(_load_pool_cached(str(stock_pool_path), stock_pool_path.stat().st_mtime_ns))
                 logger.info(f"成功加载{len(stock_codes)}只股票")
                 return stock_codes
             else:
@@ -168,7 +287,7 @@ class DataInterface:
     
     def get_stock_data(self, stock_code: str, period: Type[Period] = Period.Day,
                       start_date: datetime = None, end_date: datetime = None,
-                      file_format: str = 'csv') -> pd.DataFrame:
+                      file_format: str = 'parquet') -> pd.DataFrame:
         """
         获取股票数据
         :param stock_code: 股票代码
@@ -190,7 +309,11 @@ class DataInterface:
                     logger.info(f"指定格式文件不存在，使用 {alt_format} 格式文件: {file_path}")
             
             if file_path.exists():
-                df = self.get_df_from_file(input_path=file_path)
+                if file_path.is_dir():
+                    # 分区数据集直接下推日期条件，只读取命中的年份分区
+                    df = self.get_df_from_dataset(dataset_dir=file_path, start_date=start_date, end_date=end_date)
+                else:
+                    df = self.get_df_from_file(input_path=file_path)
                 
                 # 如果指定了日期范围，进行过滤
                 if not df.empty and (start_date is not None or end_date is not None):
@@ -209,15 +332,49 @@ class DataInterface:
             logger.error(f"获取股票数据失败: {e}")
             return pd.DataFrame()
     
+    def get_stock_data_range(self, stock_code: str, period: Type[Period] = Period.Day) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        获取parquet缓存数据的时间范围，只读取文件footer中的行组统计信息，不解码数据
+        :param stock_code: 股票代码
+        :param period: K线周期，使用Period枚举，例如：Period.Day, Period.Min_5等
+        :return: (最早时间, 最晚时间)，缓存不存在或缺少统计信息时返回None
+        """
+        try:
+            file_path = self.get_stock_data_path(stock_code=stock_code, period=period, file_format='parquet')
+            if not file_path.exists():
+                return None
+            
+            files = sorted(file_path.rglob('*.parquet')) if file_path.is_dir() else [file_path]
+            first, last = None, None
+            for parquet_file in files:
+                metadata = pq.read_metadata(parquet_file)
+                column = metadata.schema.to_arrow_schema().get_field_index(self.PARQUET_INDEX_COLUMN)
+                if column < 0:
+                    return None
+                for i in range(metadata.num_row_groups):
+                    stats = metadata.row_group(i).column(column).statistics
+                    if stats is None or not stats.has_min_max:
+                        return None
+                    row_group_min, row_group_max = pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+                    first = row_group_min if first is None else min(first, row_group_min)
+                    last = row_group_max if last is None else max(last, row_group_max)
+            
+            if first is None:
+                return None
+            return first, last
+        except Exception as e:
+            logger.error(f"获取缓存数据时间范围失败: {e}")
+            return None
+    
     def save_stock_data(self, stock_code: str, df: pd.DataFrame,
-                       period: Type[Period] = Period.Day, file_format: str = 'csv',
+                       period: Type[Period] = Period.Day, file_format: str = 'parquet',
                        force_update: bool = False) -> bool:
         """
         保存股票数据
         :param stock_code: 股票代码
         :param df: 股票数据DataFrame
         :param period: K线周期，使用Period枚举，例如：Period.Day, Period.Min_5等
-        :param file_format: 文件格式
+        :param file_format: 文件格式 ('csv' 或 'parquet')，默认使用Snappy压缩的parquet
         :param force_update: 是否强制更新，True时直接覆盖原文件，False时与已有数据合并
         :return: 是否保存成功
         """
@@ -228,10 +385,13 @@ class DataInterface:
             
             file_path = self.get_stock_data_path(stock_code=stock_code, period=period, file_format=file_format)
             
+            # 落盘前统一列类型：SDK返回的Decimal对象转为float64，成交量转为int64
+            df = self.normalize_ohlcv_dtypes(df)
+            
             # 如果强制更新，直接保存
             if force_update:
                 logger.info(f"强制更新模式，直接保存数据到: {file_path}")
-                return self.save_df_to_file(df=df, file_path=str(file_path), file_format=file_format)
+                return self._write_stock_file(df=df, file_path=file_path, file_format=file_format)
             
             # 非强制更新模式，需要合并数据
             final_df = df.copy()
@@ -250,7 +410,7 @@ class DataInterface:
                     existing_df = self.get_df_from_file(input_path=alt_file_path)
                     # 删除旧格式文件，使用新格式保存
                     try:
-                        alt_file_path.unlink()
+                        self.remove_path(alt_file_path)
                         logger.info(f"已删除旧格式文件: {alt_file_path}")
                     except Exception as e:
                         logger.warning(f"删除旧格式文件失败: {e}")
@@ -276,7 +436,7 @@ class DataInterface:
                 logger.info(f"文件不存在，直接保存新数据到: {file_path}")
             
             # 保存最终合并后的数据
-            success = self.save_df_to_file(df=final_df, file_path=str(file_path), file_format=file_format)
+            success = self._write_stock_file(df=final_df, file_path=file_path, file_format=file_format)
             
             if success:
                 logger.success(f"股票数据保存成功: {stock_code}, 记录数: {len(final_df)}")
@@ -287,6 +447,18 @@ class DataInterface:
             logger.error(f"保存股票数据失败: {e}")
             return False
     
+    def _write_stock_file(self, df: pd.DataFrame, file_path: Path, file_format: str) -> bool:
+        """
+        按格式写入股票数据：parquet写为按年份分区的数据集，csv写为单文件
+        :param df: 股票数据DataFrame
+        :param file_path: 数据文件路径
+        :param file_format: 文件格式 ('csv' 或 'parquet')
+        :return: 是否保存成功
+        """
+        if file_format == 'parquet':
+            return self.save_df_to_dataset(df=df, dataset_dir=str(file_path))
+        return self.save_df_to_file(df=df, file_path=str(file_path), file_format=file_format)
+    
     # ==================== 数据处理相关 ====================
     
     def validate_data(self, df: pd.DataFrame, check_nan: bool = True, 
@@ -343,6 +515,24 @@ class DataInterface:
             
         return validation_result
 
+    def normalize_ohlcv_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        统一K线数据的列类型：价格和成交额由Decimal对象转为float64，成交量转为int64
+        ta-lib等指标库只接受double数组；成交量使用int64，乘法或差分时不会溢出回绕
+        :param df: K线数据DataFrame
+        :return: 类型统一后的DataFrame
+        """
+        # 只转换类型不符的列，类型已经统一的数据原样返回，不产生拷贝
+        updates = {}
+        for col in ('Open', 'High', 'Low', 'Close', 'Turnover'):
+            if col in df.columns and df[col].dtype != 'float64':
+                updates[col] = pd.to_numeric(df[col]).astype('float64')
+        if 'Volume' in df.columns and df['Volume'].dtype != 'int64' and df['Volume'].notna().all():
+            updates['Volume'] = pd.to_numeric(df['Volume']).astype('int64')
+        if updates:
+            df = df.assign(**updates)
+        return df
+
     # ==================== 文件格式转换 ====================
 
     def convert_csv_to_parquet(self, input_file: Path) -> bool:
@@ -370,9 +560,16 @@ class DataInterface:
         :return: bool
         """
         if input_file.suffix == '.parquet':
-            output_file = input_file.as_posix().replace('.parquet', '.csv')
+            output_file = input_file.with_suffix('.csv')
             logger.info(f'Converting {input_file} to {output_file}')
-            df = pd.read_parquet(input_file)
+            if input_file.is_dir():
+                # 按年份分区的数据集，时间索引还原为普通列写入CSV
+                df = self.get_df_from_dataset(dataset_dir=input_file)
+                if df.empty:
+                    return False
+                df = df.reset_index()
+            else:
+                df = pd.read_parquet(input_file)
             df.to_csv(output_file, index=False)
             logger.success(f'转换完成: {output_file}')
             return True
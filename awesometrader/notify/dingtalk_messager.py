@@ -22,12 +22,21 @@ class DingTalkMessager:
         """
         self.dingtalk_webhook = dingtalk_webhook
         self.dingtalk_secret = dingtalk_secret
+        # 复用HTTP会话，多次发送消息时保持连接，避免重复建立TLS连接
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
         
         if self.dingtalk_webhook:
             logger.info("钉钉机器人已配置")
         else:
             logger.info("钉钉机器人未配置")
     
+    def close(self) -> None:
+        """
+        关闭HTTP会话，释放连接池
+        """
+        self.session.close()
+    
     def _generate_sign(self, timestamp: int) -> str:
         """
         生成钉钉机器人加签
@@ -89,8 +98,7 @@ class DingTalkMessager:
                 webhook_url += f"&timestamp={timestamp}&sign={sign}"
             
             # 发送请求
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(webhook_url, data=json.dumps(data), headers=headers, timeout=10)
+            response = self.session.post(webhook_url, data=json.dumps(data), timeout=10)
             
             if response.status_code == 200:
                 result = response.json()
@@ -149,8 +157,7 @@ class DingTalkMessager:
                 webhook_url += f"&timestamp={timestamp}&sign={sign}"
             
             # 发送请求
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(webhook_url, data=json.dumps(data), headers=headers, timeout=10)
+            response = self.session.post(webhook_url, data=json.dumps(data), timeout=10)
             
             if response.status_code == 200:
                 result = response.json()
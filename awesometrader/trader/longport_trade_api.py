@@ -1,4 +1,5 @@
 from __future__ import annotations
+import asyncio
 from loguru import logger
 from datetime import date, datetime
 from typing import Optional, List, Type, TYPE_CHECKING
@@ -325,3 +326,38 @@ class LongPortTradeAPI:
             logger.error(f"获取当日订单失败: {str(e)}")
             raise
 
+    async def get_order_detail_async(self, order_id: str) -> OrderDetail:
+        """
+        异步获取订单详情
+        LongPort SDK只提供同步接口，这里将同步请求放到线程中执行，便于用asyncio.gather并发查询
+
+        Args:
+            order_id: 订单ID，例如：701276261045858304
+
+        Returns:
+            OrderDetail: 订单详情对象，与get_order_detail相同
+        """
+        return await asyncio.to_thread(self.get_order_detail, order_id)
+
+    async def get_today_orders_async(self,
+                                     symbol: Optional[str] = None,
+                                     status: Optional[List[Type[OrderStatus]]] = None,
+                                     side: Optional[Type[OrderSide]] = None,
+                                     market: Optional[Type[Market]] = None,
+                                     order_id: Optional[str] = None) -> List[Order]:
+        """
+        异步获取当日订单
+        LongPort SDK只提供同步接口，这里将同步请求放到线程中执行，便于用asyncio.gather并发查询
+
+        Args:
+            symbol: 可选，股票代码，使用 ticker.region 格式，例如：AAPL.US
+            status: 可选，订单状态列表，例如：[OrderStatus.Filled, OrderStatus.New]
+            side: 可选，买卖方向，Buy-买入，Sell-卖出
+            market: 可选，市场，US-美股，HK-港股
+            order_id: 可选，订单ID，用于指定订单ID查询
+
+        Returns:
+            List[Order]: 当日订单列表，与get_today_orders相同
+        """
+        return await asyncio.to_thread(self.get_today_orders, symbol=symbol, status=status,
+                                       side=side, market=market, order_id=order_id)
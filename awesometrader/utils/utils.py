@@ -2,7 +2,7 @@ from pathlib import Path
 from typing import Optional
 
 class Utils:
-    """项目工具类，提供通用的路径和目录管理功能"""
+    """项目工具类，提供通用的路径和目录管理功能，以及K线周期的解析"""
     
     @staticmethod
     def get_project_root(marker_files: Optional[list] = None) -> Path:
@@ -44,3 +44,37 @@ class Utils:
         cache_dir.mkdir(exist_ok=True)
         return cache_dir
 
+    @staticmethod
+    def get_period_name(period) -> str:
+        """
+        获取K线周期的名称
+        Period不是标准枚举，通过repr获取名称然后提取周期部分
+        
+        :param period: K线周期，使用Period枚举，例如：Period.Day, Period.Min_5等
+        :return: 周期名称，例如："Day"、"Min_5"
+        """
+        period_repr = repr(period)  # 例如: "Period.Day" 或 "Period.Min_1"
+        return period_repr.split('.', 1)[1] if '.' in period_repr else period_repr
+
+    @staticmethod
+    def get_period_minutes(period) -> Optional[int]:
+        """
+        获取单根K线覆盖的最短分钟数，月/季/年按最短自然长度计算
+        
+        :param period: K线周期，使用Period枚举，例如：Period.Day, Period.Min_5等
+        :return: 单根K线的分钟数，无法识别的周期返回None
+        """
+        period_name = Utils.get_period_name(period)
+        if period_name.startswith('Min_'):
+            return int(period_name.split('_', 1)[1])
+        
+        period_days = {
+            'Day': 1,
+            'Week': 7,
+            'Month': 28,
+            'Quarter': 89,
+            'Year': 365
+        }
+        if period_name in period_days:
+            return period_days[period_name] * 24 * 60
+        return None
@@ -0,0 +1,50 @@
+"""
+pytest 公共配置
+
+真实接口测试（LongPort / 钉钉）统一标记为 network，默认跳过，
+需要显式传入 --network 才会执行，避免在无网络或无凭证的环境中等待SDK超时。
+
+真实接口测试以网络等待为主，可以用 pytest-xdist 按进程并行执行：
+    pytest -n 4 --network tests/test_data_simple.py
+每个 worker 进程各自在 setUpClass 中创建行情接口，测试方法之间不共享可变状态。
+
+交易测试连接真实账户，除 --network 外还需要设置 LONGPORT_LIVE_TESTS=1 才会执行。
+只读的查询测试同样可以并行，订单测试通过 xdist_group 固定在同一个 worker 上，
+需要配合 --dist loadgroup 使用，避免并发提交订单：
+    LONGPORT_LIVE_TESTS=1 pytest -n 3 --dist loadgroup --network tests/test_trade_simple.py
+"""
+
+import os
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--network",
+        action="store_true",
+        default=False,
+        help="运行需要访问真实接口的 network 测试",
+    )
+    parser.addoption(
+        "--live",
+        action="store_true",
+        default=False,
+        help="忽略本地数据快照，重新请求真实接口并刷新快照",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "network: 需要访问真实接口的测试，使用 --network 开启")
+    # 未安装 pytest-xdist 时也注册分组标记，避免未知标记警告
+    config.addinivalue_line("markers", "xdist_group(name): pytest-xdist 以 --dist loadgroup 运行时固定在同一个 worker 上的测试")
+    if config.getoption("--live"):
+        os.environ["AT_TEST_LIVE"] = "1"
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--network"):
+        return
+    skip_network = pytest.mark.skip(reason="需要 --network 参数才会运行真实接口测试")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip_network)
@@ -0,0 +1,8 @@
+"""
+测试模块共用的运行开关
+"""
+
+import os
+
+# 设置 AT_TEST_VERBOSE=1 时输出逐条记录（股票、账户、流水等）的明细日志，默认只保留汇总信息
+VERBOSE = os.getenv('AT_TEST_VERBOSE') == '1'
@@ -7,20 +7,193 @@ import os
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import asyncio
+import bisect
+import random
 import unittest
+import pytest
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import attrgetter
 from datetime import datetime, time
+from typing import Optional, Tuple
 from loguru import logger
 from longport.openapi import Period, AdjustType
 from awesometrader import DataInterface, LongPortQuotaAPI
+from tests.helpers import VERBOSE
 
+# 长桥API凭证环境变量
+LONGPORT_ENV_KEYS = ('LONGPORT_APP_KEY', 'LONGPORT_APP_SECRET', 'LONGPORT_ACCESS_TOKEN')
+
+# 历史K线测试日期范围，使用Timestamp与DatetimeIndex直接比较
+START_DATE = pd.Timestamp('2020-01-01')
+END_DATE = pd.Timestamp('2025-06-06')
+
+# 历史K线快照，设置 AT_TEST_LIVE=1（或 pytest --live）时重新请求真实接口并刷新快照
+LIVE = os.getenv('AT_TEST_LIVE') == '1'
+HISTORY_FIXTURE_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+# 设置 AT_KEEP_CACHE=1 时保留测试写入的parquet缓存，下次运行直接命中缓存而不再请求接口
+KEEP_CACHE = os.getenv('AT_KEEP_CACHE') == '1'
+# 判断缓存是否覆盖日期范围时的容差，起止日期可能落在休市日
+CACHE_RANGE_SLACK = pd.Timedelta(days=7)
+
+# 未配置凭证时直接跳过，避免每个测试都等待SDK超时
+pytestmark = pytest.mark.skipif(
+    not all(os.getenv(key) for key in LONGPORT_ENV_KEYS),
+    reason='LongPort creds required'
+)
+
+# K线DataFrame应包含的列
+HISTORY_COLUMNS = frozenset(('Open', 'High', 'Low', 'Close', 'Volume', 'Turnover'))
+
+# 盘口每一档必须有值的字段
+DEPTH_LEVEL_FIELDS = ('position', 'price', 'volume', 'order_num')
+
+# 循环内的断言消息模板，只在断言失败时才做 % 格式化，成功路径不再拼接字符串
+DEPTH_MISSING_MSG = "%s盘第%d档缺少字段: %s"
+DEPTH_POSITION_MSG = "%s盘档位应该从1开始递增: 第%d档的position为%s"
+DEPTH_NEGATIVE_MSG = "%s盘第%d档的%s应该大于等于0"
+OPTION_QUOTE_NONE_MSG = "期权%s的行情数据不应该为None"
+
+# 固定种子的随机数生成器，期权抽样结果在多次运行间保持一致
+_RNG = random.Random(0)
+
+# 期权链行权价数量达到该值时改用NumPy筛选价格范围，数量较少时纯Python更快
+OPTION_CHAIN_NUMPY_THRESHOLD = 64
+
+# 期权行情测试中打印的OptionQuote字段及显示名称
+OPTION_QUOTE_FIELDS = (
+    ('last_done', '最新价'),
+    ('prev_close', '昨收价'),
+    ('open', '开盘价'),
+    ('high', '最高价'),
+    ('low', '最低价'),
+    ('volume', '成交量'),
+    ('turnover', '成交额'),
+    ('implied_volatility', '隐含波动率'),
+    ('open_interest', '未平仓合约数'),
+    ('strike_price', '行权价'),
+    ('expiry_date', '到期日'),
+)
+
+
+def _assert_valid_history(df: pd.DataFrame, start: datetime = None, end: datetime = None):
+    """
+    校验K线DataFrame的基本不变量，遇到第一个不满足的条件即抛出AssertionError
+    :param df: K线数据
+    :param start: 数据最早时间下限，可选
+    :param end: 数据最晚时间上限，可选
+    """
+    assert df is not None, "K线数据不应该为None"
+    assert isinstance(df, pd.DataFrame), "K线数据应该是DataFrame类型"
+    assert not df.empty, "K线数据不应该为空"
+    missing = HISTORY_COLUMNS - set(df.columns)
+    assert not missing, f"DataFrame缺少列: {sorted(missing)}"
+    assert isinstance(df.index, pd.DatetimeIndex), "索引应该是时间类型"
+    if start is not None:
+        assert df.index[0] >= start, "数据开始时间应该不早于指定开始时间"
+    if end is not None:
+        assert df.index[-1] <= end, "数据结束时间应该不晚于指定结束时间"
+
+
+def _format_option_quote(symbol: str, option_type: str, quote) -> str:
+    """
+    将期权行情格式化为多行文本，只包含OptionQuote中确实存在且不为None的字段
+    :param symbol: 期权代码
+    :param option_type: 期权类型 CALL/PUT
+    :param quote: 期权行情
+    :return: 以空行开头的多行文本
+    """
+    lines = ["", f"期权代码: {symbol} ({option_type})"]
+    for attr, label in OPTION_QUOTE_FIELDS:
+        value = getattr(quote, attr, None)
+        if value is not None:
+            lines.append(f"  {label}: {value}")
+    return "\n".join(lines)
+
+
+def _summarize_history(df: pd.DataFrame) -> str:
+    """
+    一次取出收盘价、最高价、最低价和成交量，在同一个数组上计算统计信息
+    :param df: K线数据
+    :return: 统计信息文本
+    """
+    arr = df[['Close', 'High', 'Low', 'Volume']].to_numpy()
+    return (
+        f"  最新收盘价: {arr[-1, 0]}\n"
+        f"  最高价: {arr[:, 1].max()}\n"
+        f"  最低价: {arr[:, 2].min()}\n"
+        f"  平均成交量: {arr[:, 3].mean():,.0f}"
+    )
+
+
+@pytest.mark.network
 class TestDataModule(unittest.TestCase):
-    def setUp(self):
-        """每个测试方法之前运行"""
-        # 初始化数据接口
-        self.data_interface = DataInterface()
-        self.collector = LongPortQuotaAPI()
+    # 测试共用的股票代码
+    TEST_STOCK = 'BABA.US'
+
+    @classmethod
+    def setUpClass(cls):
+        """所有测试方法之前运行一次"""
+        # 数据接口和行情接口在整个测试类中复用，行情接口只建立一次连接和认证
+        cls.data_interface = DataInterface()
+        
+        # 用一次轻量请求探测凭证和网络，不可用时整个测试类直接跳过，避免每个测试都等待超时
+        try:
+            cls.collector = LongPortQuotaAPI()
+            cls.collector.get_trading_session()
+        except Exception as e:
+            raise unittest.SkipTest(f"LongPort接口不可用: {e}")
+        
+        # 批量预取测试中用到的标的行情，各测试共用，失败时为空字典
+        cls.quote_cache = cls.collector.get_stock_quote([cls.TEST_STOCK])
+
+    @classmethod
+    def tearDownClass(cls):
+        """所有测试方法之后运行一次"""
+        # 释放行情连接
+        cls.collector = None
+        cls.data_interface = None
+        cls.quote_cache = None
+
+    def _cached_history(self, stock_code: str, period: Period, adjust_type: AdjustType,
+                        start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        获取历史K线，优先读取按请求参数命名的本地快照，LIVE模式或快照不存在时请求真实接口并刷新快照
+        :param stock_code: 股票代码
+        :param period: K线周期
+        :param adjust_type: 复权类型
+        :param start_date: 开始日期
+        :param end_date: 结束日期
+        :return: 历史K线数据
+        """
+        # 快照文件名包含全部请求参数，参数变化时不会误用旧快照
+        period_name = repr(period).split('.', 1)[-1].lower()
+        adjust_name = repr(adjust_type).split('.', 1)[-1].lower()
+        fixture_path = HISTORY_FIXTURE_DIR / f"{stock_code}_{period_name}_{adjust_name}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.parquet"
         
+        if not LIVE and fixture_path.exists():
+            # 优先读取本地快照，避免每次都请求真实接口
+            logger.info(f"使用本地历史数据快照: {fixture_path}")
+            return pd.read_parquet(fixture_path)
+        
+        daily_data = self.collector.get_stock_history(
+            stock_code=stock_code,
+            period=period,
+            adjust_type=adjust_type,
+            start_date=start_date,
+            end_date=end_date
+        )
+        if len(daily_data):
+            fixture_path.parent.mkdir(parents=True, exist_ok=True)
+            daily_data.to_parquet(fixture_path, compression='snappy')
+            logger.info(f"已刷新本地历史数据快照: {fixture_path}")
+        return daily_data
+
     def tearDown(self):
         """每个测试方法之后运行"""
         # 清理资源
@@ -35,7 +208,7 @@ class TestDataModule(unittest.TestCase):
         logger.info(f"✓ DataInterface初始化成功，缓存目录: {self.data_interface.cache_dir}")
         
         # 定义统一的测试股票代码
-        test_stock_code = "BABA.US"
+        test_stock_code = self.TEST_STOCK
         
         # 测试get_stock_data_path方法
         # 测试CSV格式路径
@@ -76,6 +249,8 @@ class TestDataModule(unittest.TestCase):
             logger.warning("股票池为空，可能是stock_pool.csv文件不存在或为空")
         
         # 测试save_stock_data方法 - 获取BABA真实数据并保存
+        # 只有取数放在try中，后面的断言不能被except吞掉
+        daily_data = pd.DataFrame()
         try:
             logger.info(f"开始获取{test_stock_code}的日线数据进行保存测试")
             
@@ -85,70 +260,90 @@ class TestDataModule(unittest.TestCase):
             
             logger.info(f"获取日期范围: {start_date.date()} 到 {end_date.date()}")
             
-            # 使用LongPortQuotaAPI获取真实数据
-            daily_data = self.collector.get_stock_history(
-                stock_code=test_stock_code,
-                period=Period.Day,
-                adjust_type=AdjustType.ForwardAdjust,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            if not daily_data.empty:
-                logger.info(f"✓ 成功获取{test_stock_code}数据: {len(daily_data)} 条记录")
-                
-                # 测试保存股票数据
-                success = self.data_interface.save_stock_data(
+            # 已有parquet缓存覆盖该日期范围时直接读取缓存，否则请求真实接口
+            cached_range = self.data_interface.get_stock_data_range(test_stock_code, Period.Day)
+            if (cached_range is not None
+                    and cached_range[0] <= start_date + CACHE_RANGE_SLACK
+                    and cached_range[1] >= end_date - CACHE_RANGE_SLACK):
+                logger.info(f"缓存命中: {cached_range[0]} 到 {cached_range[1]}")
+                daily_data = self.data_interface.get_stock_data(
+                    test_stock_code, Period.Day, start_date=start_date, end_date=end_date
+                )
+            else:
+                logger.info("缓存未命中，使用LongPortQuotaAPI获取真实数据")
+                daily_data = self.collector.get_stock_history(
                     stock_code=test_stock_code,
-                    df=daily_data,
                     period=Period.Day,
-                    file_format='csv',
-                    force_update=True
-                )
-                self.assertTrue(success, "保存BABA股票数据应该成功")
-                logger.info("✓ BABA股票数据保存功能正常")
-                
-                # 验证保存的数据可以读取
-                saved_data = self.data_interface.get_stock_data(test_stock_code, Period.Day)
-                self.assertFalse(saved_data.empty, "保存的BABA数据应该可以读取")
-                self.assertEqual(len(saved_data), len(daily_data), "保存和读取的数据行数应该一致")
-                logger.info("✓ BABA股票数据读取功能正常")
-                
-                # 测试全量读取
-                full_data = self.data_interface.get_stock_data(test_stock_code, Period.Day)
-                self.assertFalse(full_data.empty, "全量读取数据不应该为空")
-                logger.info(f"✓ 全量读取成功: {len(full_data)} 条记录")
-                
-                # 测试读取2025年数据（应该为空，因为保存的是2024年数据）
-                data_2025 = self.data_interface.get_stock_data(
-                    test_stock_code, 
-                    Period.Day, 
-                    start_date=datetime(2025, 5, 1), 
-                    end_date=datetime(2025, 5, 30)
+                    adjust_type=AdjustType.ForwardAdjust,
+                    start_date=start_date,
+                    end_date=end_date
                 )
-                self.assertTrue(data_2025.empty, "2025年数据应该为空（因为保存的是2024年数据）")
-                logger.info("✓ 2025年数据过滤正确（返回空数据）")
-                
-                # 测试读取2024年部分数据
-                data_2024_partial = self.data_interface.get_stock_data(
-                    test_stock_code, 
-                    Period.Day, 
-                    start_date=datetime(2024, 6, 1), 
-                    end_date=datetime(2024, 6, 30)
-                )
-                logger.info(f"✓ 2024年6月数据读取: {len(data_2024_partial)} 条记录")
-                
-            else:
-                logger.warning(f"未能获取{test_stock_code}的历史数据，跳过保存测试")
-                
         except Exception as e:
             logger.error(f"获取BABA数据失败: {e}")
-            logger.warning("如果API配置有问题，将使用模拟数据进行测试")
         
-        # 清理测试数据
-        test_file_path = self.data_interface.get_stock_data_path(test_stock_code, Period.Day, 'csv')
-        if test_file_path.exists():
-            test_file_path.unlink()
+        if not daily_data.empty:
+            logger.info(f"✓ 成功获取{test_stock_code}数据: {len(daily_data)} 条记录")
+            
+            # 测试保存股票数据
+            success = self.data_interface.save_stock_data(
+                stock_code=test_stock_code,
+                df=daily_data,
+                period=Period.Day,
+                file_format='parquet',
+                force_update=True
+            )
+            self.assertTrue(success, "保存BABA股票数据应该成功")
+            logger.info("✓ BABA股票数据保存功能正常")
+            
+            # 通过parquet footer元数据校验落盘行数，无需解码数据
+            num_rows = sum(pq.ParquetFile(f).metadata.num_rows for f in parquet_path.rglob('*.parquet'))
+            self.assertEqual(num_rows, len(daily_data), "保存和读取的数据行数应该一致")
+            
+            # 全量读取一次，验证保存的数据内容
+            saved_data = self.data_interface.get_stock_data(test_stock_code, Period.Day)
+            self.assertFalse(saved_data.empty, "保存的BABA数据应该可以读取")
+            self.assertListEqual(saved_data['Close'].tolist(), pd.to_numeric(daily_data['Close']).astype('float64').tolist(),
+                                 "保存和读取的收盘价应该一致")
+            # 落盘时价格统一为float64，成交量统一为int64
+            for col in ('Open', 'High', 'Low', 'Close'):
+                self.assertEqual(saved_data[col].dtype, 'float64', f"{col}列应该是float64类型")
+            self.assertEqual(saved_data['Volume'].dtype, 'int64', "Volume列应该是int64类型")
+            
+            # 读取后的成交量参与乘法和差分运算时不能溢出回绕，以Python整数的计算结果为准
+            volumes = [int(v) for v in saved_data['Volume']]
+            self.assertListEqual((saved_data['Volume'] * 1000).tolist(), [v * 1000 for v in volumes],
+                                 "成交量乘法结果不应该溢出")
+            volume_values = saved_data['Volume'].to_numpy()
+            self.assertListEqual((volume_values[1:] - volume_values[:-1]).tolist(),
+                                 [b - a for a, b in zip(volumes, volumes[1:])],
+                                 "成交量差分结果不应该回绕")
+            logger.info(f"✓ BABA股票数据读取功能正常: {len(saved_data)} 条记录")
+            
+            # 测试读取2025年数据（应该为空，因为保存的是2024年数据）
+            data_2025 = self.data_interface.get_stock_data(
+                test_stock_code, 
+                Period.Day, 
+                start_date=datetime(2025, 5, 1), 
+                end_date=datetime(2025, 5, 30)
+            )
+            self.assertTrue(data_2025.empty, "2025年数据应该为空（因为保存的是2024年数据）")
+            logger.info("✓ 2025年数据过滤正确（返回空数据）")
+            
+            # 测试读取2024年部分数据
+            data_2024_partial = self.data_interface.get_stock_data(
+                test_stock_code, 
+                Period.Day, 
+                start_date=datetime(2024, 6, 1), 
+                end_date=datetime(2024, 6, 30)
+            )
+            logger.info(f"✓ 2024年6月数据读取: {len(data_2024_partial)} 条记录")
+        else:
+            logger.warning(f"未能获取{test_stock_code}的历史数据，跳过保存测试")
+        
+        # 清理测试数据，设置 AT_KEEP_CACHE=1 时保留缓存供下次运行复用
+        test_file_path = self.data_interface.get_stock_data_path(test_stock_code, Period.Day, 'parquet')
+        if test_file_path.exists() and not KEEP_CACHE:
+            self.data_interface.remove_path(test_file_path)
             logger.info("✓ 测试数据清理完成")
         
         logger.success("=== DataInterface功能测试完成 ===")
@@ -171,50 +366,26 @@ class TestDataModule(unittest.TestCase):
             
             # 验证各市场数据
             expected_markets = ['US', 'HK', 'CN', 'SG']  # 根据文档，这些是主要支持的市场
-            found_markets = []
+            found_markets = [market_session.market for market_session in market_sessions]
+            
+            # 结构校验一次完成：每个市场都有交易时段，所有起止时间都是time类型
+            # time对象本身保证了小时和分钟的有效性，无需再逐个检查范围
+            empty_markets = [ms.market for ms in market_sessions if not ms.trade_sessions]
+            self.assertFalse(empty_markets, f"以下市场没有交易时段: {empty_markets}")
+            bound_types = {type(t) for ms in market_sessions for s in ms.trade_sessions for t in (s.begin_time, s.end_time)}
+            self.assertEqual(bound_types, {time}, f"交易时段起止时间应该是time类型: {bound_types}")
             
             for market_session in market_sessions:
-                # 验证市场信息结构
-                market = market_session.market
-                found_markets.append(market)
-                
-                logger.info(f"市场: {market}")
-                
-                # 验证交易时段
-                trade_sessions = market_session.trade_sessions
-                self.assertIsNotNone(trade_sessions, f"市场{market}的交易时段不应该为None")
-                self.assertTrue(len(trade_sessions) > 0, f"市场{market}应该至少有一个交易时段")
-                
-                for session in trade_sessions:
-                    # 验证交易时段结构
-                    begin_time = session.begin_time
-                    end_time = session.end_time
-                    
-                    # 验证时间格式（应该是time类型）
-                    self.assertIsInstance(begin_time, time, f"开始时间应该是time类型: {begin_time}")
-                    self.assertIsInstance(end_time, time, f"结束时间应该是time类型: {end_time}")
-                    
-                    # 验证时间有效性（time对象本身就保证了有效性，这里验证小时和分钟范围）
-                    self.assertTrue(0 <= begin_time.hour <= 23, f"开始时间小时应该在0-23范围内: {begin_time.hour}")
-                    self.assertTrue(0 <= begin_time.minute <= 59, f"开始时间分钟应该在0-59范围内: {begin_time.minute}")
-                    self.assertTrue(0 <= end_time.hour <= 23, f"结束时间小时应该在0-23范围内: {end_time.hour}")
-                    self.assertTrue(0 <= end_time.minute <= 59, f"结束时间分钟应该在0-59范围内: {end_time.minute}")
-                    
-                    # 格式化显示时间
-                    start_time = begin_time.strftime("%H:%M")
-                    end_time_str = end_time.strftime("%H:%M")
-                    
+                logger.info(f"市场: {market_session.market}")
+                for session in market_session.trade_sessions:
                     # 获取交易时段类型
-                    trade_session_value = session.trade_session
-                    if trade_session_value == 1:
+                    if session.trade_session == 1:
                         session_type = "盘前交易"
-                    elif trade_session_value == 2:
+                    elif session.trade_session == 2:
                         session_type = "盘后交易"
                     else:
                         session_type = "正常交易"
-                    
-                    logger.info(f"  交易时段: {start_time} - {end_time_str} ({session_type})")
-                
+                    logger.info(f"  交易时段: {session.begin_time:%H:%M} - {session.end_time:%H:%M} ({session_type})")
                 logger.info("-" * 30)
             
             # 验证是否包含主要市场
@@ -294,42 +465,38 @@ class TestDataModule(unittest.TestCase):
                     watched_at = security.watched_at
                     self.assertIsNotNone(watched_at, f"第{i+1}只股票的关注时间不应该为None")
                     
-                    logger.info(f"股票 {i+1}:")
-                    logger.info(f"  代码: {symbol}")
-                    logger.info(f"  名称: {name}")
-                    logger.info(f"  市场: {market}")
+                    if VERBOSE:
+                        logger.info(f"股票 {i+1}:")
+                        logger.info(f"  代码: {symbol}")
+                        logger.info(f"  名称: {name}")
+                        logger.info(f"  市场: {market}")
                     
-                    # 关注价格可能为None
-                    if security.watched_price is not None:
-                        logger.info(f"  关注价格: {security.watched_price}")
-                    else:
-                        logger.info(f"  关注价格: 未设置")
+                        # 关注价格可能为None
+                        if security.watched_price is not None:
+                            logger.info(f"  关注价格: {security.watched_price}")
+                        else:
+                            logger.info(f"  关注价格: 未设置")
                     
-                    logger.info(f"  关注时间: {watched_at}")
-                    logger.info("-" * 30)
+                        logger.info(f"  关注时间: {watched_at}")
+                        logger.info("-" * 30)
                 
                 # 统计不同市场的股票数量
-                market_stats = {}
-                for security in stock_list:
-                    market = str(security.market)
-                    market_stats[market] = market_stats.get(market, 0) + 1
+                market_stats = pd.Series([str(security.market) for security in stock_list]).value_counts().to_dict()
                 
                 logger.info("市场分布统计:")
                 for market, count in market_stats.items():
                     logger.info(f"  {market}: {count} 只股票")
                 
                 # 检查股票代码是否有重复
-                symbols = [security.symbol for security in stock_list]
-                unique_symbols = set(symbols)
+                symbols = pd.Index([security.symbol for security in stock_list])
+                dup_mask = symbols.duplicated(keep=False)
                 
-                if len(symbols) == len(unique_symbols):
+                if not dup_mask.any():
                     logger.info("✓ 股票代码无重复")
                 else:
-                    logger.warning(f"股票代码有重复: 总数 {len(symbols)}, 去重后 {len(unique_symbols)}")
+                    logger.warning(f"股票代码有重复: 总数 {len(symbols)}, 去重后 {symbols.nunique()}")
                     # 找出重复的股票代码
-                    from collections import Counter
-                    symbol_counts = Counter(symbols)
-                    duplicates = [symbol for symbol, count in symbol_counts.items() if count > 1]
+                    duplicates = symbols[dup_mask].unique().tolist()
                     logger.warning(f"重复的股票代码: {duplicates}")
                 
                 logger.success("自选股列表数据验证完成")
@@ -371,19 +538,20 @@ class TestDataModule(unittest.TestCase):
                 for symbol, info in basic_info.items():
                     self.assertIsNotNone(symbol, f"股票代码{symbol}不应该为None")
 
-                    logger.info(f"股票 {symbol}:")
-                    logger.info(f"  中文名: {info.name_cn}")
-                    logger.info(f"  英文名: {info.name_en}")
-                    logger.info(f"  交易所: {info.exchange}")
-                    logger.info(f"  货币: {info.currency}")
-                    logger.info(f"  每手股数: {info.lot_size}")
-                    logger.info(f"  总股本: {info.total_shares:,}")
-                    logger.info(f"  每股收益: {info.eps}")
-                    logger.info(f"  每股收益(TTM): {info.eps_ttm}")
-                    logger.info(f"  每股净资产: {info.bps}")
-                    logger.info(f"  股息率: {info.dividend_yield}%")
-                    logger.info(f"  板块: {info.board}")
-                    logger.info("---")
+                    if VERBOSE:
+                        logger.info(f"股票 {symbol}:")
+                        logger.info(f"  中文名: {info.name_cn}")
+                        logger.info(f"  英文名: {info.name_en}")
+                        logger.info(f"  交易所: {info.exchange}")
+                        logger.info(f"  货币: {info.currency}")
+                        logger.info(f"  每手股数: {info.lot_size}")
+                        logger.info(f"  总股本: {info.total_shares:,}")
+                        logger.info(f"  每股收益: {info.eps}")
+                        logger.info(f"  每股收益(TTM): {info.eps_ttm}")
+                        logger.info(f"  每股净资产: {info.bps}")
+                        logger.info(f"  股息率: {info.dividend_yield}%")
+                        logger.info(f"  板块: {info.board}")
+                        logger.info("---")
             else:
                 self.fail("未能获取股票基础信息")
                 
@@ -420,25 +588,26 @@ class TestDataModule(unittest.TestCase):
                     self.assertIsNotNone(symbol, f"股票代码{symbol}不应该为None")
                     self.assertIsNotNone(quote_data, f"股票{symbol}的行情数据不应该为None")
 
-                    logger.info(f"股票代码: {symbol}")
-                    logger.info(f"  最新价: {quote_data.last_done}")
-                    logger.info(f"  昨收价: {quote_data.prev_close}")
-                    logger.info(f"  开盘价: {quote_data.open}")
-                    logger.info(f"  最高价: {quote_data.high}")
-                    logger.info(f"  最低价: {quote_data.low}")
-                    logger.info(f"  成交量: {quote_data.volume}")
-                    logger.info(f"  成交额: {quote_data.turnover}")
-                    logger.info(f"  交易状态: {quote_data.trade_status}")
+                    if VERBOSE:
+                        logger.info(f"股票代码: {symbol}")
+                        logger.info(f"  最新价: {quote_data.last_done}")
+                        logger.info(f"  昨收价: {quote_data.prev_close}")
+                        logger.info(f"  开盘价: {quote_data.open}")
+                        logger.info(f"  最高价: {quote_data.high}")
+                        logger.info(f"  最低价: {quote_data.low}")
+                        logger.info(f"  成交量: {quote_data.volume}")
+                        logger.info(f"  成交额: {quote_data.turnover}")
+                        logger.info(f"  交易状态: {quote_data.trade_status}")
 
-                    # 如果有盘前行情数据
-                    if quote_data.pre_market_quote:
-                        logger.info(f"  盘前最新价: {quote_data.pre_market_quote.last_done}")
+                        # 如果有盘前行情数据
+                        if quote_data.pre_market_quote:
+                            logger.info(f"  盘前最新价: {quote_data.pre_market_quote.last_done}")
 
-                    # 如果有盘后行情数据
-                    if quote_data.post_market_quote:
-                        logger.info(f"  盘后最新价: {quote_data.post_market_quote.last_done}")
+                        # 如果有盘后行情数据
+                        if quote_data.post_market_quote:
+                            logger.info(f"  盘后最新价: {quote_data.post_market_quote.last_done}")
                     
-                    logger.info("-" * 30)
+                        logger.info("-" * 30)
                     
                 logger.success("股票实时行情获取示例完成")
             else:
@@ -476,70 +645,71 @@ class TestDataModule(unittest.TestCase):
                     self.assertIsNotNone(symbol, f"股票代码{symbol}不应该为None")
                     self.assertIsNotNone(calc_index, f"股票{symbol}的计算指标数据不应该为None")
 
-                    logger.info(f"股票代码: {symbol}")
-                    logger.info(f"  最新价: {calc_index.last_done}")
+                    if VERBOSE:
+                        logger.info(f"股票代码: {symbol}")
+                        logger.info(f"  最新价: {calc_index.last_done}")
 
-                    # 基础价格指标
-                    if calc_index.change_value:
-                        logger.info(f"  涨跌额: {calc_index.change_value}")
-                    if calc_index.change_rate:
-                        logger.info(f"  涨跌幅: {calc_index.change_rate}%")
+                        # 基础价格指标
+                        if calc_index.change_value:
+                            logger.info(f"  涨跌额: {calc_index.change_value}")
+                        if calc_index.change_rate:
+                            logger.info(f"  涨跌幅: {calc_index.change_rate}%")
 
-                    # 成交相关指标
-                    if calc_index.volume:
-                        logger.info(f"  成交量: {calc_index.volume:,}")
-                    if calc_index.turnover:
-                        logger.info(f"  成交额: {calc_index.turnover}")
-                    if calc_index.turnover_rate:
-                        logger.info(f"  换手率: {calc_index.turnover_rate}%")
+                        # 成交相关指标
+                        if calc_index.volume:
+                            logger.info(f"  成交量: {calc_index.volume:,}")
+                        if calc_index.turnover:
+                            logger.info(f"  成交额: {calc_index.turnover}")
+                        if calc_index.turnover_rate:
+                            logger.info(f"  换手率: {calc_index.turnover_rate}%")
 
-                    # 估值指标
-                    if calc_index.pe_ttm_ratio:
-                        logger.info(f"  市盈率(TTM): {calc_index.pe_ttm_ratio}")
-                    if calc_index.pb_ratio:
-                        logger.info(f"  市净率: {calc_index.pb_ratio}")
-                    if calc_index.dividend_ratio_ttm:
-                        logger.info(f"  股息率(TTM): {calc_index.dividend_ratio_ttm}%")
+                        # 估值指标
+                        if calc_index.pe_ttm_ratio:
+                            logger.info(f"  市盈率(TTM): {calc_index.pe_ttm_ratio}")
+                        if calc_index.pb_ratio:
+                            logger.info(f"  市净率: {calc_index.pb_ratio}")
+                        if calc_index.dividend_ratio_ttm:
+                            logger.info(f"  股息率(TTM): {calc_index.dividend_ratio_ttm}%")
 
-                    # 市值指标
-                    if calc_index.total_market_value:
-                        logger.info(f"  总市值: {calc_index.total_market_value}")
+                        # 市值指标
+                        if calc_index.total_market_value:
+                            logger.info(f"  总市值: {calc_index.total_market_value}")
 
-                    # 技术指标
-                    if calc_index.amplitude:
-                        logger.info(f"  振幅: {calc_index.amplitude}%")
-                    if calc_index.volume_ratio:
-                        logger.info(f"  量比: {calc_index.volume_ratio}")
+                        # 技术指标
+                        if calc_index.amplitude:
+                            logger.info(f"  振幅: {calc_index.amplitude}%")
+                        if calc_index.volume_ratio:
+                            logger.info(f"  量比: {calc_index.volume_ratio}")
 
-                    # 不同时期涨幅
-                    if calc_index.ytd_change_rate:
-                        logger.info(f"  年初至今涨幅: {calc_index.ytd_change_rate}%")
-                    if calc_index.five_day_change_rate:
-                        logger.info(f"  五日涨幅: {calc_index.five_day_change_rate}%")
-                    if calc_index.ten_day_change_rate:
-                        logger.info(f"  十日涨幅: {calc_index.ten_day_change_rate}%")
-                    if calc_index.half_year_change_rate:
-                        logger.info(f"  半年涨幅: {calc_index.half_year_change_rate}%")
+                        # 不同时期涨幅
+                        if calc_index.ytd_change_rate:
+                            logger.info(f"  年初至今涨幅: {calc_index.ytd_change_rate}%")
+                        if calc_index.five_day_change_rate:
+                            logger.info(f"  五日涨幅: {calc_index.five_day_change_rate}%")
+                        if calc_index.ten_day_change_rate:
+                            logger.info(f"  十日涨幅: {calc_index.ten_day_change_rate}%")
+                        if calc_index.half_year_change_rate:
+                            logger.info(f"  半年涨幅: {calc_index.half_year_change_rate}%")
 
-                    # 期权相关指标（如果是期权标的）
-                    if calc_index.expiry_date:
-                        logger.info(f"  到期日: {calc_index.expiry_date}")
-                    if calc_index.strike_price:
-                        logger.info(f"  行权价: {calc_index.strike_price}")
-                    if calc_index.implied_volatility:
-                        logger.info(f"  隐含波动率: {calc_index.implied_volatility}%")
+                        # 期权相关指标（如果是期权标的）
+                        if calc_index.expiry_date:
+                            logger.info(f"  到期日: {calc_index.expiry_date}")
+                        if calc_index.strike_price:
+                            logger.info(f"  行权价: {calc_index.strike_price}")
+                        if calc_index.implied_volatility:
+                            logger.info(f"  隐含波动率: {calc_index.implied_volatility}%")
 
-                    # 希腊字母（期权）
-                    if calc_index.delta:
-                        logger.info(f"  Delta: {calc_index.delta}")
-                    if calc_index.gamma:
-                        logger.info(f"  Gamma: {calc_index.gamma}")
-                    if calc_index.theta:
-                        logger.info(f"  Theta: {calc_index.theta}")
-                    if calc_index.vega:
-                        logger.info(f"  Vega: {calc_index.vega}")
+                        # 希腊字母（期权）
+                        if calc_index.delta:
+                            logger.info(f"  Delta: {calc_index.delta}")
+                        if calc_index.gamma:
+                            logger.info(f"  Gamma: {calc_index.gamma}")
+                        if calc_index.theta:
+                            logger.info(f"  Theta: {calc_index.theta}")
+                        if calc_index.vega:
+                            logger.info(f"  Vega: {calc_index.vega}")
                     
-                    logger.info("-" * 30)
+                        logger.info("-" * 30)
                 
                 logger.success("股票计算指标获取测试完成")
             else:
@@ -553,191 +723,141 @@ class TestDataModule(unittest.TestCase):
     def test_get_stock_candlesticks(self):
         logger.info("=== 测试获取股票K线数据 ===")
         
-        test_stock = 'BABA.US'
+        test_stock = self.TEST_STOCK
         
-        try:
-            logger.info(f"测试股票: {test_stock}")
-            
-            # 测试1: 获取日线数据
-            logger.info("=" * 50)
-            logger.info("测试1: 获取日线数据 (最近30条)")
-            
-            daily_data = self.collector.get_stock_candlesticks(
-                stock_code=test_stock,
-                period=Period.Day,
-                count=30,
-                adjust_type=AdjustType.NoAdjust
-            )
-            
-            # 断言测试
-            self.assertIsNotNone(daily_data, "日线数据不应该为None")
-            self.assertIsInstance(daily_data, pd.DataFrame, "日线数据应该是DataFrame类型")
-            
-            if not daily_data.empty:
-                logger.success(f"✓ 获取日线数据成功: {len(daily_data)} 条记录")
-                
-                # 验证DataFrame结构
-                expected_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Turnover']
-                for col in expected_columns:
-                    self.assertIn(col, daily_data.columns, f"DataFrame应该包含{col}列")
-                
-                # 验证数据类型
-                self.assertTrue(isinstance(daily_data.index, pd.DatetimeIndex), "索引应该是时间类型")
-                
-                # 验证数据完整性
-                self.assertFalse(daily_data.empty, "日线数据不应该为空")
-                self.assertTrue(len(daily_data) <= 30, "数据条数不应该超过请求的30条")
-                
-                # 验证OHLC数据的逻辑关系
-                for idx, row in daily_data.iterrows():
-                    if not (pd.isna(row['High']) or pd.isna(row['Low']) or pd.isna(row['Open']) or pd.isna(row['Close'])):
-                        self.assertGreaterEqual(row['High'], row['Low'], f"{idx}: 最高价应该大于等于最低价")
-                        self.assertGreaterEqual(row['High'], row['Open'], f"{idx}: 最高价应该大于等于开盘价")
-                        self.assertGreaterEqual(row['High'], row['Close'], f"{idx}: 最高价应该大于等于收盘价")
-                        self.assertLessEqual(row['Low'], row['Open'], f"{idx}: 最低价应该小于等于开盘价")
-                        self.assertLessEqual(row['Low'], row['Close'], f"{idx}: 最低价应该小于等于收盘价")
-                
-                # 打印前几条数据作为示例
-                logger.info("前5条日线数据:")
-                logger.info(f"\n{daily_data.head()}")
-                
-                logger.info(f"日线数据统计信息:")
-                logger.info(f"  数据条数: {len(daily_data)}")
-                logger.info(f"  时间范围: {daily_data.index[0]} 到 {daily_data.index[-1]}")
-                logger.info(f"  最新收盘价: {daily_data['Close'].iloc[-1]}")
-                logger.info(f"  最高价: {daily_data['High'].max()}")
-                logger.info(f"  最低价: {daily_data['Low'].min()}")
-                logger.info(f"  平均成交量: {daily_data['Volume'].mean():,.0f}")
-                
-            else:
-                logger.warning("获取到的日线数据为空")
-            
-            # 测试2: 获取60分钟线数据
-            logger.info("=" * 50)
-            logger.info("测试2: 获取60分钟线数据 (最近50条)")
-            
-            hourly_data = self.collector.get_stock_candlesticks(
-                stock_code=test_stock,
-                period=Period.Min_60,
-                count=50,
-                adjust_type=AdjustType.NoAdjust
+        logger.info(f"测试股票: {test_stock}")
+        
+        # 三组K线请求相互独立，并发获取，耗时取决于最慢的一次请求
+        async def fetch_all():
+            semaphore = asyncio.Semaphore(self.collector.CANDLESTICK_MAX_CONCURRENCY)
+            return await asyncio.gather(
+                self.collector.get_stock_candlesticks_async(test_stock, Period.Day, 30, AdjustType.NoAdjust, semaphore),
+                self.collector.get_stock_candlesticks_async(test_stock, Period.Min_60, 50, AdjustType.NoAdjust, semaphore),
+                self.collector.get_stock_candlesticks_async(test_stock, Period.Day, 20, AdjustType.ForwardAdjust, semaphore),
             )
+        
+        daily_data, hourly_data, adjusted_data = asyncio.run(fetch_all())
+        
+        # 测试1: 日线数据
+        logger.info("=" * 50)
+        logger.info("测试1: 获取日线数据 (最近30条)")
+        
+        # 断言测试
+        self.assertIsNotNone(daily_data, "日线数据不应该为None")
+        self.assertIsInstance(daily_data, pd.DataFrame, "日线数据应该是DataFrame类型")
+        
+        if len(daily_data):
+            logger.success(f"✓ 获取日线数据成功: {len(daily_data)} 条记录")
+            
+            # 验证DataFrame结构、索引类型和完整性
+            _assert_valid_history(daily_data)
+            self.assertTrue(len(daily_data) <= 30, "数据条数不应该超过请求的30条")
+            
+            # 验证OHLC数据的逻辑关系（整列比较，跳过含缺失值的行）
+            ohlc = daily_data[['Open', 'High', 'Low', 'Close']]
+            ohlc = ohlc.loc[ohlc.notna().all(axis=1)]
+            bad_high = ohlc.index[ohlc['High'] < ohlc[['Low', 'Open', 'Close']].max(axis=1)]
+            bad_low = ohlc.index[ohlc['Low'] > ohlc[['Open', 'Close']].min(axis=1)]
+            self.assertEqual(len(bad_high), 0, f"最高价应该大于等于最低价、开盘价和收盘价: {list(bad_high)}")
+            self.assertEqual(len(bad_low), 0, f"最低价应该小于等于开盘价和收盘价: {list(bad_low)}")
+            
+            # 打印前几条数据作为示例
+            logger.info("前5条日线数据:")
+            logger.opt(lazy=True).info("\n{}", lambda: daily_data.head().to_string(float_format='{:.2f}'.format))
+            
+            logger.info(f"日线数据统计信息:")
+            logger.info(f"  数据条数: {len(daily_data)}")
+            logger.info(f"  时间范围: {daily_data.index[0]} 到 {daily_data.index[-1]}")
+            logger.opt(lazy=True).info("  最新收盘价: {}", lambda: daily_data['Close'].iloc[-1])
+            logger.opt(lazy=True).info("  最高价: {}", lambda: daily_data['High'].to_numpy(copy=False).max())
+            logger.opt(lazy=True).info("  最低价: {}", lambda: daily_data['Low'].to_numpy(copy=False).min())
+            logger.opt(lazy=True).info("  平均成交量: {:,.0f}", lambda: daily_data['Volume'].to_numpy(copy=False).mean())
             
-            self.assertIsNotNone(hourly_data, "60分钟线数据不应该为None")
-            self.assertIsInstance(hourly_data, pd.DataFrame, "60分钟线数据应该是DataFrame类型")
-            
-            if not hourly_data.empty:
-                logger.success(f"✓ 获取60分钟线数据成功: {len(hourly_data)} 条记录")
-                logger.info(f"60分钟线数据时间范围: {hourly_data.index[0]} 到 {hourly_data.index[-1]}")
-                
-                # 验证数据条数
-                self.assertTrue(len(hourly_data) <= 50, "60分钟线数据条数不应该超过请求的50条")
-                
-            else:
-                logger.warning("获取到的60分钟线数据为空")
-            
-            # 测试3: 测试前复权数据
-            logger.info("=" * 50)
-            logger.info("测试3: 获取前复权日线数据 (最近20条)")
+        else:
+            logger.warning("获取到的日线数据为空")
+        
+        # 测试2: 60分钟线数据
+        logger.info("=" * 50)
+        logger.info("测试2: 获取60分钟线数据 (最近50条)")
+        
+        self.assertIsNotNone(hourly_data, "60分钟线数据不应该为None")
+        self.assertIsInstance(hourly_data, pd.DataFrame, "60分钟线数据应该是DataFrame类型")
+        
+        if len(hourly_data):
+            logger.success(f"✓ 获取60分钟线数据成功: {len(hourly_data)} 条记录")
+            logger.info(f"60分钟线数据时间范围: {hourly_data.index[0]} 到 {hourly_data.index[-1]}")
             
-            adjusted_data = self.collector.get_stock_candlesticks(
-                stock_code=test_stock,
-                period=Period.Day,
-                count=20,
-                adjust_type=AdjustType.ForwardAdjust
-            )
+            # 验证数据条数
+            self.assertTrue(len(hourly_data) <= 50, "60分钟线数据条数不应该超过请求的50条")
             
-            self.assertIsNotNone(adjusted_data, "前复权数据不应该为None")
-            self.assertIsInstance(adjusted_data, pd.DataFrame, "前复权数据应该是DataFrame类型")
+        else:
+            logger.warning("获取到的60分钟线数据为空")
+        
+        # 测试3: 前复权数据
+        logger.info("=" * 50)
+        logger.info("测试3: 获取前复权日线数据 (最近20条)")
+        
+        self.assertIsNotNone(adjusted_data, "前复权数据不应该为None")
+        self.assertIsInstance(adjusted_data, pd.DataFrame, "前复权数据应该是DataFrame类型")
+        
+        if len(adjusted_data):
+            logger.success(f"✓ 获取前复权数据成功: {len(adjusted_data)} 条记录")
+            logger.info(f"前复权数据时间范围: {adjusted_data.index[0]} 到 {adjusted_data.index[-1]}")
             
-            if not adjusted_data.empty:
-                logger.success(f"✓ 获取前复权数据成功: {len(adjusted_data)} 条记录")
-                logger.info(f"前复权数据时间范围: {adjusted_data.index[0]} 到 {adjusted_data.index[-1]}")
-                
-                # 验证数据条数
-                self.assertTrue(len(adjusted_data) <= 20, "前复权数据条数不应该超过请求的20条")
-                
-            else:
-                logger.warning("获取到的前复权数据为空")
+            # 验证数据条数
+            self.assertTrue(len(adjusted_data) <= 20, "前复权数据条数不应该超过请求的20条")
             
-            logger.success("股票K线数据获取测试完成")
-                
-        except Exception as e:
-            logger.error(f"测试失败: {e}")
-            logger.warning("请确保配置了正确的LongPort API环境变量和行情权限")
-            self.fail(f"获取股票K线数据时发生异常: {e}")
+        else:
+            logger.warning("获取到的前复权数据为空")
+        
+        logger.success("股票K线数据获取测试完成")
 
     def test_get_stock_history(self):
         logger.info("=== 测试获取股票历史K线数据 ===")
         
-        test_stock = 'BABA.US'
+        test_stock = self.TEST_STOCK
         
-        try:
-            logger.info(f"测试股票: {test_stock}")
+        logger.info(f"测试股票: {test_stock}")
+        
+        # 测试指定日期范围: 2020-01-01 到 2025-06-06
+        start_date = START_DATE
+        end_date = END_DATE
+        
+        logger.info(f"测试日期范围: {start_date.date()} 到 {end_date.date()}")
+        
+        daily_data = self._cached_history(test_stock, Period.Day, AdjustType.ForwardAdjust, start_date, end_date)
+        
+        # 断言测试
+        self.assertIsNotNone(daily_data, "历史数据不应该为None")
+        self.assertIsInstance(daily_data, pd.DataFrame, "历史数据应该是DataFrame类型")
+        
+        if len(daily_data):
+            # 缓存记录数和首尾时间，避免重复计算
+            num_rows = len(daily_data)
+            first_ts, last_ts = daily_data.index[[0, -1]]
+            logger.success(f"✓ 获取成功: {num_rows} 条记录")
             
-            # 测试指定日期范围: 2020-01-01 到 2025-06-06
-            start_date = datetime(2020, 1, 1)
-            end_date = datetime(2025, 6, 6)
+            # 验证DataFrame结构、索引类型、完整性以及数据在指定范围内
+            _assert_valid_history(daily_data, start_date, end_date)
             
-            logger.info(f"测试日期范围: {start_date.date()} 到 {end_date.date()}")
+            # 打印前几条数据作为示例
+            logger.info("前5条历史数据:")
+            logger.opt(lazy=True).info("\n{}", lambda: daily_data.head().to_string(float_format='{:.2f}'.format))
             
-            daily_data = self.collector.get_stock_history(
-                stock_code=test_stock,
-                period=Period.Day,
-                adjust_type=AdjustType.ForwardAdjust,
-                start_date=start_date,
-                end_date=end_date
-            )
+            logger.info(f"数据统计信息:")
+            logger.info(f"  数据条数: {num_rows}")
+            logger.info(f"  时间范围: {first_ts} 到 {last_ts}")
+            logger.opt(lazy=True).info("{}", lambda: _summarize_history(daily_data))
             
-            # 断言测试
-            self.assertIsNotNone(daily_data, "历史数据不应该为None")
-            self.assertIsInstance(daily_data, pd.DataFrame, "历史数据应该是DataFrame类型")
-            
-            if not daily_data.empty:
-                logger.success(f"✓ 获取成功: {len(daily_data)} 条记录")
-                
-                # 验证DataFrame结构
-                expected_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 'Turnover']
-                for col in expected_columns:
-                    self.assertIn(col, daily_data.columns, f"DataFrame应该包含{col}列")
-                
-                # 验证数据类型
-                self.assertTrue(isinstance(daily_data.index, pd.DatetimeIndex), "索引应该是时间类型")
-                
-                # 验证数据完整性
-                self.assertFalse(daily_data.empty, "历史数据不应该为空")
-                self.assertTrue(len(daily_data) > 0, "应该有历史数据记录")
-                
-                # 验证数据在指定范围内
-                self.assertTrue(daily_data.index[0] >= start_date, "数据开始时间应该不早于指定开始时间")
-                self.assertTrue(daily_data.index[-1] <= end_date, "数据结束时间应该不晚于指定结束时间")
-                
-                # 打印前几条数据作为示例
-                logger.info("前5条历史数据:")
-                logger.info(f"\n{daily_data.head()}")
-                
-                logger.info(f"数据统计信息:")
-                logger.info(f"  数据条数: {len(daily_data)}")
-                logger.info(f"  时间范围: {daily_data.index[0]} 到 {daily_data.index[-1]}")
-                logger.info(f"  最新收盘价: {daily_data['Close'].iloc[-1]}")
-                logger.info(f"  最高价: {daily_data['High'].max()}")
-                logger.info(f"  最低价: {daily_data['Low'].min()}")
-                logger.info(f"  平均成交量: {daily_data['Volume'].mean():,.0f}")
-                
-            else:
-                logger.warning("获取到的历史数据为空")
-            
-            logger.success("股票历史数据获取测试完成")
-                
-        except Exception as e:
-            logger.error(f"测试失败: {e}")
-            logger.warning("请确保配置了正确的LongPort API环境变量和权限")
-            self.fail(f"获取股票历史数据时发生异常: {e}")
+        else:
+            logger.warning("获取到的历史数据为空")
+        
+        logger.success("股票历史数据获取测试完成")
 
     def test_get_option_quote(self):
         logger.info("=== 测试获取期权行情 ===")
         
-        test_stock = 'BABA.US'
+        test_stock = self.TEST_STOCK
         
         try:
             logger.info(f"测试标的股票: {test_stock}")
@@ -746,7 +866,7 @@ class TestDataModule(unittest.TestCase):
             logger.info("=" * 50)
             logger.info("步骤1: 获取标的股票当前价格")
             
-            stock_quote = self.collector.get_stock_quote([test_stock])
+            stock_quote = self.quote_cache
             if not stock_quote or test_stock not in stock_quote:
                 self.skipTest(f"无法获取{test_stock}的股票行情，跳过期权测试")
             
@@ -778,12 +898,19 @@ class TestDataModule(unittest.TestCase):
             today = date.today()
             one_week_later = today + timedelta(days=7)
             
-            recent_expiry_dates = [d for d in expiry_dates if today <= d <= one_week_later]
+            # 到期日只排序一次，二分查找截取 [today, one_week_later] 窗口
+            sorted_expiry_dates = sorted(expiry_dates)
+            lo = bisect.bisect_left(sorted_expiry_dates, today)
+            hi = bisect.bisect_right(sorted_expiry_dates, one_week_later)
+            recent_expiry_dates = sorted_expiry_dates[lo:hi]
             
             if not recent_expiry_dates:
                 # 如果一周内没有到期日，取最近的一个到期日进行测试
                 logger.warning("一周内没有到期日，使用最近的1个到期日进行测试")
-                recent_expiry_dates = sorted([d for d in expiry_dates if d >= today])[:1]
+                recent_expiry_dates = sorted_expiry_dates[lo:lo + 1]
+            
+            if not recent_expiry_dates:
+                self.skipTest(f"{test_stock}没有未到期的期权，跳过测试")
             
             logger.info(f"筛选后的到期日 (最近一周或最近1个): {recent_expiry_dates}")
             
@@ -794,39 +921,54 @@ class TestDataModule(unittest.TestCase):
             all_call_options = []
             all_put_options = []
             
-            for expiry_date in recent_expiry_dates:
-                logger.info(f"处理到期日: {expiry_date}")
-                
-                option_chain = self.collector.get_option_chain_info_by_date(test_stock, expiry_date)
-                self.assertIsNotNone(option_chain, f"期权链信息不应该为None: {expiry_date}")
-                self.assertIsInstance(option_chain, list, f"期权链信息应该是列表类型: {expiry_date}")
-                
-                if not option_chain:
-                    logger.warning(f"到期日 {expiry_date} 没有期权链数据")
-                    continue
-                
-                logger.info(f"到期日 {expiry_date} 共 {len(option_chain)} 个行权价")
-                
-                # 筛选5%价格范围内的期权
-                filtered_options = [
-                    opt for opt in option_chain 
-                    if min_strike <= opt.price <= max_strike
-                ]
-                
-                logger.info(f"价格范围内的期权: {len(filtered_options)} 个")
-                
-                for option in filtered_options:
-                    strike_price = option.price
-                    call_symbol = option.call_symbol
-                    put_symbol = option.put_symbol
+            # 各到期日的期权链请求相互独立，并发获取，按完成顺序处理结果
+            with ThreadPoolExecutor(max_workers=min(8, len(recent_expiry_dates))) as executor:
+                futures = {
+                    executor.submit(self.collector.get_option_chain_info_by_date, test_stock, expiry_date): expiry_date
+                    for expiry_date in recent_expiry_dates
+                }
+                for future in as_completed(futures):
+                    expiry_date = futures[future]
+                    logger.info(f"处理到期日: {expiry_date}")
+                    
+                    option_chain = future.result()
+                    self.assertIsNotNone(option_chain, f"期权链信息不应该为None: {expiry_date}")
+                    self.assertIsInstance(option_chain, list, f"期权链信息应该是列表类型: {expiry_date}")
+                    
+                    if not option_chain:
+                        logger.warning(f"到期日 {expiry_date} 没有期权链数据")
+                        continue
+                    
+                    logger.info(f"到期日 {expiry_date} 共 {len(option_chain)} 个行权价")
+                    
+                    # 按行权价排序后二分截取5%价格范围内的期权，行权价较多时改用NumPy排序和searchsorted
+                    if len(option_chain) >= OPTION_CHAIN_NUMPY_THRESHOLD:
+                        prices = np.fromiter((float(opt.price) for opt in option_chain), dtype=np.float64, count=len(option_chain))
+                        order = np.argsort(prices, kind='stable')
+                        sorted_prices = prices[order]
+                        lo = np.searchsorted(sorted_prices, min_strike, side='left')
+                        hi = np.searchsorted(sorted_prices, max_strike, side='right')
+                        filtered_options = [option_chain[i] for i in order[lo:hi]]
+                    else:
+                        option_chain = sorted(option_chain, key=attrgetter('price'))
+                        lo = bisect.bisect_left(option_chain, min_strike, key=attrgetter('price'))
+                        hi = bisect.bisect_right(option_chain, max_strike, key=attrgetter('price'))
+                        filtered_options = option_chain[lo:hi]
+                    
+                    logger.info(f"价格范围内的期权: {len(filtered_options)} 个")
+                    
+                    for option in filtered_options:
+                        strike_price = option.price
+                        call_symbol = option.call_symbol
+                        put_symbol = option.put_symbol
 
-                    logger.info(f"  行权价: {strike_price}")
-                    if call_symbol:
-                        logger.info(f"    CALL: {call_symbol}")
-                        all_call_options.append(call_symbol)
-                    if put_symbol:
-                        logger.info(f"    PUT:  {put_symbol}")
-                        all_put_options.append(put_symbol)
+                        logger.info(f"  行权价: {strike_price}")
+                        if call_symbol:
+                            logger.info(f"    CALL: {call_symbol}")
+                            all_call_options.append(call_symbol)
+                        if put_symbol:
+                            logger.info(f"    PUT:  {put_symbol}")
+                            all_put_options.append(put_symbol)
             
             logger.info(f"总共筛选出 CALL 期权: {len(all_call_options)} 个")
             logger.info(f"总共筛选出 PUT 期权: {len(all_put_options)} 个")
@@ -843,8 +985,8 @@ class TestDataModule(unittest.TestCase):
             max_options = 50  # 限制期权数量，避免超出API限制
             if len(all_options) > max_options:
                 logger.warning(f"期权数量({len(all_options)})超过限制，随机选择{max_options}个进行测试")
-                import random
-                all_options = random.sample(all_options, max_options)
+                # 期权链按完成顺序合并，先排序再抽样，保证同一组期权每次抽到的结果相同
+                all_options = _RNG.sample(sorted(all_options), max_options)
             
             if all_options:
                 option_quotes = self.collector.get_option_quote(all_options)
@@ -858,34 +1000,24 @@ class TestDataModule(unittest.TestCase):
                 # 验证和展示期权行情数据
                 call_count = 0
                 put_count = 0
+                # 期权链里已经区分了CALL和PUT，直接按所属集合判断类型，不从代码字符串里猜
+                call_symbols = set(all_call_options)
+                put_symbols = set(all_put_options)
                 
                 for symbol, quote in option_quotes.items():
-                    self.assertIsNotNone(symbol, f"期权代码{symbol}不应该为None")
-                    self.assertIsNotNone(quote, f"期权{symbol}的行情数据不应该为None")
+                    # 字典的键不会是None，只需检查行情本身
+                    if quote is None:
+                        self.fail(OPTION_QUOTE_NONE_MSG % symbol)
                     
                     # 判断是CALL还是PUT
-                    option_type = "CALL" if "C" in symbol else "PUT" if "P" in symbol else "UNKNOWN"
+                    option_type = "CALL" if symbol in call_symbols else "PUT" if symbol in put_symbols else "UNKNOWN"
                     if option_type == "CALL":
                         call_count += 1
                     elif option_type == "PUT":
                         put_count += 1
                     
-                    logger.info(f"期权代码: {symbol} ({option_type})")
-
-                    # 验证期权行情字段（只打印OptionQuote类型中确实存在的字段）
-                    logger.info(f"  最新价: {quote.last_done}")
-                    logger.info(f"  昨收价: {quote.prev_close}")
-                    logger.info(f"  开盘价: {quote.open}")
-                    logger.info(f"  最高价: {quote.high}")
-                    logger.info(f"  最低价: {quote.low}")
-                    logger.info(f"  成交量: {quote.volume}")
-                    logger.info(f"  成交额: {quote.turnover}")
-                    logger.info(f"  隐含波动率: {quote.implied_volatility}")
-                    logger.info(f"  未平仓合约数: {quote.open_interest}")
-                    logger.info(f"  行权价: {quote.strike_price}")
-                    logger.info(f"  到期日: {quote.expiry_date}")
-                    
-                    logger.info("-" * 30)
+                    # 每个期权的行情字段合并为一条日志，只在实际输出时才拼接
+                    logger.opt(lazy=True).info("{}", lambda: _format_option_quote(symbol, option_type, quote))
                 
                 # 总结统计
                 logger.info("=" * 50)
@@ -901,129 +1033,130 @@ class TestDataModule(unittest.TestCase):
             else:
                 self.skipTest("没有符合条件的期权代码")
                 
+        except unittest.SkipTest:
+            raise
         except Exception as e:
             logger.error(f"测试失败: {e}")
             logger.warning("请确保配置了正确的LongPort API环境变量和期权权限")
             self.fail(f"获取期权行情时发生异常: {e}")
 
+    def _check_depth(self, stock_code: str) -> Tuple[str, bool, Optional[str]]:
+        """
+        获取并校验单只股票的盘口数据，供线程池并发调用
+        :param stock_code: 股票代码
+        :return: (股票代码, 是否成功, 失败原因)，没有盘口权限时返回失败而不是抛出异常
+        """
+        try:
+            logger.info("=" * 50)
+            logger.info(f"测试股票: {stock_code}")
+            
+            # 获取盘口数据
+            depth_data = self.collector.get_depth(stock_code)
+            
+            # 基本断言测试
+            self.assertIsNotNone(depth_data, f"股票{stock_code}的盘口数据不应该为None")
+
+            logger.info(f"✓ 成功获取股票 {stock_code} 的盘口数据")
+            
+            # 验证和展示卖盘数据
+            ask_data = depth_data.asks
+            self.assertIsNotNone(ask_data, f"股票{stock_code}的卖盘数据不应该为None")
+            self.assertIsInstance(ask_data, list, f"股票{stock_code}的卖盘数据应该是列表类型")
+            
+            logger.info(f"  卖盘档位数: {len(ask_data)}")
+            
+            if ask_data:
+                logger.info("  卖盘详情:")
+                # 档位明细使用loguru占位符，日志级别过滤掉时不做字符串格式化
+                for i, ask in enumerate(ask_data[:5]):  # 只显示前5档
+                    # 验证数据有效性，一次列出所有缺失的字段
+                    missing = [name for name in DEPTH_LEVEL_FIELDS if getattr(ask, name, None) is None]
+                    if missing:
+                        self.fail(DEPTH_MISSING_MSG % ('卖', i + 1, missing))
+                    
+                    # 验证档位顺序
+                    if ask.position != i + 1:
+                        self.fail(DEPTH_POSITION_MSG % ('卖', i + 1, ask.position))
+                    
+                    # 验证数值类型和合理性
+                    if ask.volume < 0:
+                        self.fail(DEPTH_NEGATIVE_MSG % ('卖', i + 1, '挂单量'))
+                    if ask.order_num < 0:
+                        self.fail(DEPTH_NEGATIVE_MSG % ('卖', i + 1, '订单数'))
+                    
+                    logger.info("    档位{}: 价格={}, 量={}, 订单数={}", ask.position, ask.price, ask.volume, ask.order_num)
+            else:
+                logger.warning(f"  股票 {stock_code} 当前没有卖盘数据")
+            
+            # 验证和展示买盘数据
+            bid_data = depth_data.bids
+            self.assertIsNotNone(bid_data, f"股票{stock_code}的买盘数据不应该为None")
+            self.assertIsInstance(bid_data, list, f"股票{stock_code}的买盘数据应该是列表类型")
+            
+            logger.info(f"  买盘档位数: {len(bid_data)}")
+            
+            if bid_data:
+                logger.info("  买盘详情:")
+                for i, bid in enumerate(bid_data[:5]):  # 只显示前5档
+                    # 验证数据有效性，一次列出所有缺失的字段
+                    missing = [name for name in DEPTH_LEVEL_FIELDS if getattr(bid, name, None) is None]
+                    if missing:
+                        self.fail(DEPTH_MISSING_MSG % ('买', i + 1, missing))
+                    
+                    # 验证档位顺序
+                    if bid.position != i + 1:
+                        self.fail(DEPTH_POSITION_MSG % ('买', i + 1, bid.position))
+                    
+                    # 验证数值类型和合理性
+                    if bid.volume < 0:
+                        self.fail(DEPTH_NEGATIVE_MSG % ('买', i + 1, '挂单量'))
+                    if bid.order_num < 0:
+                        self.fail(DEPTH_NEGATIVE_MSG % ('买', i + 1, '订单数'))
+                    
+                    logger.info("    档位{}: 价格={}, 量={}, 订单数={}", bid.position, bid.price, bid.volume, bid.order_num)
+            else:
+                logger.warning(f"  股票 {stock_code} 当前没有买盘数据")
+            
+            # 前5档价格一次性转为数组，缺失或为0的价格记为NaN，不参与比较
+            ask_prices = np.fromiter((float(a.price) if a.price else np.nan for a in ask_data[:5]), dtype=np.float64)
+            bid_prices = np.fromiter((float(b.price) if b.price else np.nan for b in bid_data[:5]), dtype=np.float64)
+            
+            # 验证买卖盘价格关系（如果都有数据）
+            if ask_prices.size and bid_prices.size and not np.isnan(ask_prices[0]) and not np.isnan(bid_prices[0]):
+                spread = ask_prices[0] - bid_prices[0]
+                self.assertGreaterEqual(spread, 0, f"股票{stock_code}的最优卖价应该大于等于最优买价")
+                logger.info("  买卖价差: {:.4f}", spread)
+                logger.info("  买卖价差率: {:.4f}%", spread / bid_prices[0] * 100)
+            
+            # 验证卖盘价格递增、买盘价格递减（相邻差值中含NaN的比较结果为False，自动跳过）
+            bad_ask_levels = (np.flatnonzero(np.diff(ask_prices) < 0) + 2).tolist()
+            bad_bid_levels = (np.flatnonzero(np.diff(bid_prices) > 0) + 2).tolist()
+            self.assertFalse(bad_ask_levels, f"股票{stock_code}卖盘第{bad_ask_levels}档价格应该大于等于上一档价格")
+            self.assertFalse(bad_bid_levels, f"股票{stock_code}买盘第{bad_bid_levels}档价格应该小于等于上一档价格")
+            
+            logger.success(f"✓ 股票 {stock_code} 盘口数据验证通过")
+            return stock_code, True, None
+            
+        except Exception as e:
+            logger.error(f"测试股票 {stock_code} 失败: {e}")
+            # 如果是特定的错误（如权限问题），我们继续测试其他股票
+            if "权限" in str(e) or "permission" in str(e).lower():
+                logger.warning(f"股票 {stock_code} 可能没有盘口数据权限，继续测试其他股票")
+                return stock_code, False, str(e)
+            # 其他错误则抛出异常
+            self.fail(f"获取股票 {stock_code} 盘口数据时发生异常: {e}")
+
     def test_get_depth(self):
         logger.info("=== 测试获取标的盘口数据 ===")
         
         # 指定测试股票：BABA.US (普通股票)
-        test_stocks = ['BABA.US']
+        test_stocks = [self.TEST_STOCK]
         logger.info(f"测试指定标的: {test_stocks}")
         
-        successful_tests = 0
-        
-        for stock_code in test_stocks:
-            try:
-                logger.info("=" * 50)
-                logger.info(f"测试股票: {stock_code}")
-                
-                # 获取盘口数据
-                depth_data = self.collector.get_depth(stock_code)
-                
-                # 基本断言测试
-                self.assertIsNotNone(depth_data, f"股票{stock_code}的盘口数据不应该为None")
-
-                logger.info(f"✓ 成功获取股票 {stock_code} 的盘口数据")
-                
-                # 验证和展示卖盘数据
-                ask_data = depth_data.asks
-                self.assertIsNotNone(ask_data, f"股票{stock_code}的卖盘数据不应该为None")
-                self.assertIsInstance(ask_data, list, f"股票{stock_code}的卖盘数据应该是列表类型")
-                
-                logger.info(f"  卖盘档位数: {len(ask_data)}")
-                
-                if ask_data:
-                    logger.info("  卖盘详情:")
-                    for i, ask in enumerate(ask_data[:5]):  # 只显示前5档
-                        # 验证数据有效性
-                        self.assertIsNotNone(ask.position, f"卖盘第{i+1}档的档位不应该为None")
-                        self.assertIsNotNone(ask.price, f"卖盘第{i+1}档的价格不应该为None")
-                        self.assertIsNotNone(ask.volume, f"卖盘第{i+1}档的挂单量不应该为None")
-                        self.assertIsNotNone(ask.order_num, f"卖盘第{i+1}档的订单数不应该为None")
-                        
-                        # 验证档位顺序
-                        self.assertEqual(ask.position, i + 1, f"卖盘档位应该从1开始递增")
-                        
-                        # 验证数值类型和合理性
-                        self.assertTrue(ask.volume >= 0, f"卖盘第{i+1}档的挂单量应该大于等于0")
-                        self.assertTrue(ask.order_num >= 0, f"卖盘第{i+1}档的订单数应该大于等于0")
-                        
-                        logger.info(f"    档位{ask.position}: 价格={ask.price}, 量={ask.volume}, 订单数={ask.order_num}")
-                else:
-                    logger.warning(f"  股票 {stock_code} 当前没有卖盘数据")
-                
-                # 验证和展示买盘数据
-                bid_data = depth_data.bids
-                self.assertIsNotNone(bid_data, f"股票{stock_code}的买盘数据不应该为None")
-                self.assertIsInstance(bid_data, list, f"股票{stock_code}的买盘数据应该是列表类型")
-                
-                logger.info(f"  买盘档位数: {len(bid_data)}")
-                
-                if bid_data:
-                    logger.info("  买盘详情:")
-                    for i, bid in enumerate(bid_data[:5]):  # 只显示前5档
-                        # 验证数据有效性
-                        self.assertIsNotNone(bid.position, f"买盘第{i+1}档的档位不应该为None")
-                        self.assertIsNotNone(bid.price, f"买盘第{i+1}档的价格不应该为None")
-                        self.assertIsNotNone(bid.volume, f"买盘第{i+1}档的挂单量不应该为None")
-                        self.assertIsNotNone(bid.order_num, f"买盘第{i+1}档的订单数不应该为None")
-                        
-                        # 验证档位顺序
-                        self.assertEqual(bid.position, i + 1, f"买盘档位应该从1开始递增")
-                        
-                        # 验证数值类型和合理性
-                        self.assertTrue(bid.volume >= 0, f"买盘第{i+1}档的挂单量应该大于等于0")
-                        self.assertTrue(bid.order_num >= 0, f"买盘第{i+1}档的订单数应该大于等于0")
-                        
-                        logger.info(f"    档位{bid.position}: 价格={bid.price}, 量={bid.volume}, 订单数={bid.order_num}")
-                else:
-                    logger.warning(f"  股票 {stock_code} 当前没有买盘数据")
-                
-                # 验证买卖盘价格关系（如果都有数据）
-                if ask_data and bid_data:
-                    # 将价格转换为float进行比较
-                    best_ask_price = float(ask_data[0].price) if ask_data[0].price else None
-                    best_bid_price = float(bid_data[0].price) if bid_data[0].price else None
-                    
-                    if best_ask_price is not None and best_bid_price is not None:
-                        self.assertGreaterEqual(best_ask_price, best_bid_price, 
-                                              f"股票{stock_code}的最优卖价应该大于等于最优买价")
-                        logger.info(f"  买卖价差: {best_ask_price - best_bid_price:.4f}")
-                        logger.info(f"  买卖价差率: {(best_ask_price - best_bid_price) / best_bid_price * 100:.4f}%")
-                
-                # 验证卖盘价格递增关系
-                if len(ask_data) > 1:
-                    for i in range(1, min(len(ask_data), 5)):  # 检查前5档
-                        price_prev = float(ask_data[i-1].price) if ask_data[i-1].price else 0
-                        price_curr = float(ask_data[i].price) if ask_data[i].price else 0
-                        if price_prev > 0 and price_curr > 0:
-                            self.assertGreaterEqual(price_curr, price_prev, 
-                                                  f"股票{stock_code}卖盘第{i+1}档价格应该大于等于第{i}档价格")
-                
-                # 验证买盘价格递减关系
-                if len(bid_data) > 1:
-                    for i in range(1, min(len(bid_data), 5)):  # 检查前5档
-                        price_prev = float(bid_data[i-1].price) if bid_data[i-1].price else float('inf')
-                        price_curr = float(bid_data[i].price) if bid_data[i].price else float('inf')
-                        if price_prev < float('inf') and price_curr < float('inf'):
-                            self.assertLessEqual(price_curr, price_prev, 
-                                               f"股票{stock_code}买盘第{i+1}档价格应该小于等于第{i}档价格")
-                
-                successful_tests += 1
-                logger.success(f"✓ 股票 {stock_code} 盘口数据验证通过")
-                
-            except Exception as e:
-                logger.error(f"测试股票 {stock_code} 失败: {e}")
-                # 如果是特定的错误（如权限问题），我们继续测试其他股票
-                if "权限" in str(e) or "permission" in str(e).lower():
-                    logger.warning(f"股票 {stock_code} 可能没有盘口数据权限，继续测试其他股票")
-                    continue
-                else:
-                    # 其他错误则抛出异常
-                    self.fail(f"获取股票 {stock_code} 盘口数据时发生异常: {e}")
+        # 各股票的盘口请求相互独立，用线程池并发获取，断言失败会在取结果时重新抛出
+        with ThreadPoolExecutor(max_workers=min(16, len(test_stocks))) as executor:
+            results = list(executor.map(self._check_depth, test_stocks))
+        successful_tests = sum(1 for _, ok, _ in results if ok)
         
         # 测试总结
         logger.info("=" * 50)
@@ -1041,20 +1174,16 @@ class TestDataModule(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    # 创建测试套件
-    suite = unittest.TestSuite()
+    # 配置日志：紧凑格式，不做序列化
+    logger.remove()
+    logger.add(sys.stderr, format="{time:HH:mm:ss} | {level} | {message}", level="INFO", enqueue=False)
     
-    # 添加测试用例 - 按照collector里的实现顺序
-    suite.addTest(TestDataModule('test_data_interface'))
-    suite.addTest(TestDataModule('test_get_trading_session'))
-    suite.addTest(TestDataModule('test_get_stock_list'))
-    suite.addTest(TestDataModule('test_get_stock_basic_info'))
-    suite.addTest(TestDataModule('test_get_stock_quote'))
-    suite.addTest(TestDataModule('test_get_stock_calc_index'))
-    suite.addTest(TestDataModule('test_get_stock_candlesticks'))
-    suite.addTest(TestDataModule('test_get_stock_history'))
-    suite.addTest(TestDataModule('test_get_option_quote'))
-    suite.addTest(TestDataModule('test_get_depth'))
+    # 创建测试套件 - 按测试方法在文件中的定义顺序（即collector里的实现顺序）执行
+    loader = unittest.TestLoader()
+    loader.sortTestMethodsUsing = lambda a, b: (
+        getattr(TestDataModule, a).__code__.co_firstlineno - getattr(TestDataModule, b).__code__.co_firstlineno
+    )
+    suite = loader.loadTestsFromTestCase(TestDataModule)
     
     # 运行测试
     runner = unittest.TextTestRunner(verbosity=2)
@@ -1068,17 +1197,19 @@ if __name__ == "__main__":
     print(f"- 错误数: {len(result.errors)}")
     print(f"- 跳过数: {len(result.skipped) if hasattr(result, 'skipped') else 0}")
     
+    # 失败和错误详情合并为一次写入
+    report = []
     if result.failures:
-        print("\n失败的测试:")
-        for test, trace in result.failures:
-            print(f"- {test}: {trace}")
+        report.append("\n失败的测试:")
+        report.extend(f"- {test}: {trace}" for test, trace in result.failures)
     
     if result.errors:
-        print("\n错误的测试:")
-        for test, trace in result.errors:
-            print(f"- {test}: {trace}")
+        report.append("\n错误的测试:")
+        report.extend(f"- {test}: {trace}" for test, trace in result.errors)
     
-    print("="*50)
+    report.append("="*50)
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
     
     # 退出码
     exit_code = 0 if result.wasSuccessful() else 1
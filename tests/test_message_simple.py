@@ -8,19 +8,30 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
+import pytest
 from datetime import datetime, date
 from loguru import logger
 from awesometrader.notify import DingTalkMessager
 import time
 
+# 真实钉钉Webhook测试，默认跳过，需要 --network 参数才会运行
+pytestmark = pytest.mark.network
+
 
 class TestMessageModule(unittest.TestCase):
-    def setUp(self):
-        """每个测试方法之前运行"""
-        # 初始化消息接口
-        self.webhook_url = "https://oapi.dingtalk.com/robot/send?access_token=31017c949ed2c36aa3cdad026f5ff29ea44b38633b26ce90e0197d092191b963"
-        self.secret = "SECab458845ce006384fd7b7e12959440c9f803106b7140e3ce109373dff3e11d81"
-        self.messager = DingTalkMessager(dingtalk_webhook=self.webhook_url, dingtalk_secret=self.secret)
+    @classmethod
+    def setUpClass(cls):
+        """所有测试方法之前运行一次"""
+        # 初始化消息接口，整个测试类复用同一个HTTP会话
+        cls.webhook_url = "https://oapi.dingtalk.com/robot/send?access_token=31017c949ed2c36aa3cdad026f5ff29ea44b38633b26ce90e0197d092191b963"
+        cls.secret = "SECab458845ce006384fd7b7e12959440c9f803106b7140e3ce109373dff3e11d81"
+        cls.messager = DingTalkMessager(dingtalk_webhook=cls.webhook_url, dingtalk_secret=cls.secret)
+
+    @classmethod
+    def tearDownClass(cls):
+        """所有测试方法之后运行一次"""
+        # 关闭HTTP会话
+        cls.messager.close()
         
     def tearDown(self):
         """每个测试方法之后运行"""
@@ -4,15 +4,37 @@
 
 import sys
 import os
+import time
+import asyncio
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
+import pytest
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from itertools import islice
 from decimal import Decimal
 from loguru import logger
 from awesometrader import LongPortTradeAPI
 from longport.openapi import BalanceType
+from tests.helpers import VERBOSE
+
+# 交易测试连接真实账户（订单测试会真实下单），只有显式设置 LONGPORT_LIVE_TESTS=1 时才运行，
+# 未设置时整个模块直接跳过，不会创建交易连接或等待网络超时
+LIVE_TESTS = os.getenv('LONGPORT_LIVE_TESTS') == '1'
+
+# 日志分隔线，只构造一次
+SEP = "=" * 50
+
+# 风控等级的中文描述
+RISK_LEVEL_DESC = {
+    0: "安全",
+    1: "中风险",
+    2: "预警",
+    3: "危险",
+}
 
 def get_balance_type_desc(balance_type) -> str:
     """获取资金类别的中文描述"""
@@ -27,23 +49,286 @@ def get_balance_type_desc(balance_type) -> str:
     else:
         return f"未知({balance_type})"
 
+def get_market_name(market) -> str:
+    """获取市场枚举的名称，例如 Market.US -> US"""
+    # 枚举提供 name 属性时直接读取，否则从字符串表示中截取
+    name = getattr(market, 'name', None)
+    if isinstance(name, str):
+        return name
+    return str(market).split('.', 1)[-1]
+
+# 改单、撤单后轮询订单状态的最长等待时间（秒），以及轮询间隔的初始值和上限
+ORDER_UPDATE_TIMEOUT = 2.0
+ORDER_POLL_INITIAL_DELAY = 0.05
+ORDER_POLL_MAX_DELAY = 0.5
+
+# 撤单已被券商受理的订单状态
+CANCELLED_ORDER_STATUSES = frozenset({
+    "OrderStatus.WaitToCancel",
+    "OrderStatus.PendingCancel",
+    "OrderStatus.Canceled",
+})
+
+def wait_for(predicate, timeout: float = ORDER_UPDATE_TIMEOUT,
+             initial: float = ORDER_POLL_INITIAL_DELAY, max_delay: float = ORDER_POLL_MAX_DELAY) -> bool:
+    """
+    轮询直到条件满足或超时，轮询间隔按指数增长
+    :param predicate: 无参数的条件函数
+    :param timeout: 最长等待时间（秒）
+    :param initial: 初始轮询间隔（秒）
+    :param max_delay: 轮询间隔上限（秒）
+    :return: 超时前条件是否满足
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial
+    while not predicate():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+    return True
+
+# 资金流水分页测试的每页数量和最多请求的页数
+CASH_FLOW_PAGE_SIZE = 10
+CASH_FLOW_MAX_PAGES = 3
+
+def _prefetch_pages(fetch, kwargs: dict, pages: int):
+    """
+    逐页获取分页数据，调用方处理第N页时第N+1页已经在后台请求
+    :param fetch: 分页查询函数，接受 page 参数
+    :param kwargs: 除 page 以外的查询参数
+    :param pages: 最多获取的页数
+    :return: 逐页产出查询结果的生成器
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future = executor.submit(fetch, page=1, **kwargs)
+        for page in range(2, pages + 1):
+            next_future = executor.submit(fetch, page=page, **kwargs)
+            yield future.result()
+            future = next_future
+        yield future.result()
+
+def _summarize_account_balances(all_balances) -> str:
+    """
+    统计各币种的账户数量和净资产总计
+    :param all_balances: 账户资金列表
+    :return: 汇总信息文本
+    """
+    # 统计不同币种的账户数量
+    currency_stats = Counter(account_balance.currency for account_balance in all_balances)
+    
+    # 累计各币种净资产
+    total_net_assets = defaultdict(Decimal)
+    for account_balance in all_balances:
+        total_net_assets[account_balance.currency] += account_balance.net_assets
+    
+    lines = ["币种分布:"]
+    lines.extend(f"  {currency}: {count} 个账户" for currency, count in currency_stats.items())
+    lines.append("各币种净资产总计:")
+    lines.extend(f"  {currency}: {net_assets}" for currency, net_assets in total_net_assets.items())
+    return "\n".join(lines)
+
+def _summarize_stock_positions(all_positions) -> str:
+    """
+    统计持仓股票的数量、市场分布和币种分布
+    :param all_positions: 账户持仓列表
+    :return: 汇总信息文本
+    """
+    all_stocks = [stock_info
+                  for account_position in all_positions if account_position.positions
+                  for stock_info in account_position.positions]
+    
+    # 统计市场分布 (Market是枚举类型，转换为市场名称)
+    market_stats = Counter(get_market_name(stock_info.market) for stock_info in all_stocks)
+    
+    # 统计币种分布
+    currency_stats = Counter(stock_info.currency for stock_info in all_stocks)
+    
+    lines = [f"总持仓股票数: {len(all_stocks)}", "市场分布:"]
+    lines.extend(f"  {market}: {count} 只股票" for market, count in market_stats.items())
+    lines.append("币种分布:")
+    lines.extend(f"  {currency}: {count} 只股票" for currency, count in currency_stats.items())
+    return "\n".join(lines)
+
+def _summarize_cash_flows(cash_flows) -> str:
+    """
+    统计资金流水的方向、币种和资金类别分布
+    :param cash_flows: 资金流水列表
+    :return: 汇总信息文本
+    """
+    # 方向、币种、资金类别在一次遍历中统计完成
+    inflow_count = 0
+    outflow_count = 0
+    currency_stats = Counter()
+    business_type_stats = Counter()
+    for flow in cash_flows:
+        if flow.direction == 2:
+            inflow_count += 1
+        elif flow.direction == 1:
+            outflow_count += 1
+        currency_stats[flow.currency] += 1
+        business_type_stats[get_balance_type_desc(flow.business_type)] += 1
+    
+    lines = [
+        f"总流水记录数: {len(cash_flows)}",
+        f"资金流入记录: {inflow_count} 条",
+        f"资金流出记录: {outflow_count} 条",
+        "币种分布:",
+    ]
+    lines.extend(f"  {currency}: {count} 条流水" for currency, count in currency_stats.items())
+    lines.append("资金类别分布:")
+    lines.extend(f"  {business_type}: {count} 条流水" for business_type, count in business_type_stats.items())
+    return "\n".join(lines)
+
+# 各类返回记录需要校验的字段及期望类型，None 表示只要求字段不为None（枚举、时间等）
+ACCOUNT_BALANCE_SCHEMA = {
+    'currency': str,
+    'total_cash': Decimal,
+    'buy_power': Decimal,
+    'net_assets': Decimal,
+    'cash_infos': list,
+}
+CASH_INFO_SCHEMA = {
+    'currency': str,
+    'available_cash': Decimal,
+    'withdraw_cash': Decimal,
+    'frozen_cash': Decimal,
+    'settling_cash': Decimal,
+}
+STOCK_POSITION_CHANNEL_SCHEMA = {
+    'account_channel': str,
+    'positions': list,
+}
+STOCK_POSITION_SCHEMA = {
+    'symbol': str,
+    'symbol_name': str,
+    'quantity': Decimal,
+    'available_quantity': Decimal,
+    'currency': str,
+    'cost_price': Decimal,
+}
+CASH_FLOW_SCHEMA = {
+    'transaction_flow_name': str,
+    'direction': None,
+    'business_type': None,
+    'balance': Decimal,
+    'currency': str,
+    'business_time': None,
+}
+
+@pytest.mark.network
+@unittest.skipUnless(LIVE_TESTS, "需要设置 LONGPORT_LIVE_TESTS=1 并配置真实的LongPort凭证")
 class TestTradeModule(unittest.TestCase):
-    def setUp(self):
-        """每个测试方法之前运行"""
-        # 初始化交易接口
-        self.trader = LongPortTradeAPI()
+    @classmethod
+    def setUpClass(cls):
+        """所有测试方法之前运行一次"""
+        # 交易接口在整个测试类中复用，只建立一次连接和认证
+        cls.trader = LongPortTradeAPI()
         
-    def tearDown(self):
-        """每个测试方法之后运行"""
-        # 清理资源
-        pass
+    @classmethod
+    def tearDownClass(cls):
+        """所有测试方法之后运行一次"""
+        # 释放交易连接，SDK 提供 close() 时显式关闭，否则随对象回收断开
+        close = getattr(cls.trader.trade_ctx, 'close', None)
+        if callable(close):
+            close()
+        cls.trader = None
     
+    def _validate(self, obj, schema: dict, ctx: str):
+        """
+        按字段表校验记录，每个字段只取一次属性，缺少字段时直接抛出AttributeError，
+        所有不符合的字段汇总为一次失败
+        :param obj: 待校验的记录
+        :param schema: 字段名到期望类型的映射
+        :param ctx: 失败消息中的记录描述
+        """
+        problems = []
+        for name, expected_type in schema.items():
+            value = getattr(obj, name)
+            if expected_type is None:
+                if value is None:
+                    problems.append(f"{name}不应该为None")
+            elif not isinstance(value, expected_type):
+                problems.append(f"{name}应该是{expected_type.__name__}类型，实际为{type(value).__name__}")
+        if problems:
+            self.fail(f"{ctx}字段校验失败: {'; '.join(problems)}")
+
+    def _wait_for_order(self, order_id: str, predicate):
+        """
+        轮询订单详情直到满足条件或超时
+        :param order_id: 订单ID
+        :param predicate: 接收订单详情的条件函数
+        :return: 最后一次获取到的订单详情
+        """
+        detail = None
+
+        def check() -> bool:
+            nonlocal detail
+            detail = self.trader.get_order_detail(order_id)
+            return predicate(detail)
+
+        if not wait_for(check):
+            logger.warning(f"订单 {order_id} 在 {ORDER_UPDATE_TIMEOUT} 秒内未更新到预期状态")
+        return detail
+
+    def _log_account_balance(self, i: int, account_balance):
+        """
+        输出单个账户的资金明细
+        :param i: 账户序号，从0开始
+        :param account_balance: 账户资金记录
+        """
+        logger.info(f"账户 {i+1}:")
+        
+        # 基础信息
+        logger.info(f"  币种: {account_balance.currency}")
+        logger.info(f"  总现金: {account_balance.total_cash}")
+        logger.info(f"  购买力: {account_balance.buy_power}")
+        logger.info(f"  净资产: {account_balance.net_assets}")
+        
+        # 风控信息
+        if account_balance.risk_level is not None:
+            risk_desc = RISK_LEVEL_DESC.get(account_balance.risk_level, f"未知({account_balance.risk_level})")
+            logger.info(f"  风控等级: {risk_desc}")
+        
+        # 融资信息
+        if account_balance.max_finance_amount is not None:
+            logger.info(f"  最大融资金额: {account_balance.max_finance_amount}")
+        if account_balance.remaining_finance_amount is not None:
+            logger.info(f"  剩余融资金额: {account_balance.remaining_finance_amount}")
+        if account_balance.margin_call is not None:
+            logger.info(f"  追缴保证金: {account_balance.margin_call}")
+        
+        # 保证金信息
+        if account_balance.init_margin is not None:
+            logger.info(f"  初始保证金: {account_balance.init_margin}")
+        if account_balance.maintenance_margin is not None:
+            logger.info(f"  维持保证金: {account_balance.maintenance_margin}")
+        
+        # 现金详情
+        logger.info(f"  现金详情 ({len(account_balance.cash_infos)} 种币种):")
+        for cash_info in account_balance.cash_infos:
+            logger.info(f"    {cash_info.currency}:")
+            logger.info(f"      可用现金: {cash_info.available_cash}")
+            logger.info(f"      可提现金: {cash_info.withdraw_cash}")
+            logger.info(f"      冻结现金: {cash_info.frozen_cash}")
+            logger.info(f"      待结算现金: {cash_info.settling_cash}")
+        
+        # 冻结费用信息（如果有）
+        frozen_fee = getattr(account_balance, 'frozen_transaction_fee', None)
+        if frozen_fee:
+            logger.info(f"  冻结交易费用:")
+            logger.info(f"    币种: {frozen_fee.currency}")
+            logger.info(f"    金额: {frozen_fee.amount}")
+        
+        logger.info("-" * 30)
+
     def test_get_account_balance(self):
         logger.info("=== 测试获取账户资金信息 ===")
         
         try:
             # 测试1: 获取所有币种的账户资金
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试1: 获取所有币种的账户资金")
             
             all_balances = self.trader.get_account_balance()
@@ -57,72 +342,22 @@ class TestTradeModule(unittest.TestCase):
             
             # 验证账户资金数据结构
             for i, account_balance in enumerate(all_balances):
-                logger.info(f"账户 {i+1}:")
-                
                 # 验证数据类型
-                self.assertIsInstance(account_balance.currency, str, f"第{i+1}个账户的currency应该是字符串")
-                self.assertIsInstance(account_balance.total_cash, Decimal, f"第{i+1}个账户的total_cash应该是Decimal类型")
-                self.assertIsInstance(account_balance.buy_power, Decimal, f"第{i+1}个账户的buy_power应该是Decimal类型")
-                self.assertIsInstance(account_balance.net_assets, Decimal, f"第{i+1}个账户的net_assets应该是Decimal类型")
-                self.assertIsInstance(account_balance.cash_infos, list, f"第{i+1}个账户的cash_infos应该是列表")
-                
-                # 基础信息
-                logger.info(f"  币种: {account_balance.currency}")
-                logger.info(f"  总现金: {account_balance.total_cash}")
-                logger.info(f"  购买力: {account_balance.buy_power}")
-                logger.info(f"  净资产: {account_balance.net_assets}")
-                
-                # 风控信息
-                if account_balance.risk_level is not None:
-                    risk_level_desc = {
-                        0: "安全",
-                        1: "中风险", 
-                        2: "预警",
-                        3: "危险"
-                    }
-                    risk_desc = risk_level_desc.get(account_balance.risk_level, f"未知({account_balance.risk_level})")
-                    logger.info(f"  风控等级: {risk_desc}")
-                
-                # 融资信息
-                if account_balance.max_finance_amount is not None:
-                    logger.info(f"  最大融资金额: {account_balance.max_finance_amount}")
-                if account_balance.remaining_finance_amount is not None:
-                    logger.info(f"  剩余融资金额: {account_balance.remaining_finance_amount}")
-                if account_balance.margin_call is not None:
-                    logger.info(f"  追缴保证金: {account_balance.margin_call}")
-                
-                # 保证金信息
-                if account_balance.init_margin is not None:
-                    logger.info(f"  初始保证金: {account_balance.init_margin}")
-                if account_balance.maintenance_margin is not None:
-                    logger.info(f"  维持保证金: {account_balance.maintenance_margin}")
-                
-                # 现金详情
-                logger.info(f"  现金详情 ({len(account_balance.cash_infos)} 种币种):")
+                self._validate(account_balance, ACCOUNT_BALANCE_SCHEMA, f"第{i+1}个账户")
                 for j, cash_info in enumerate(account_balance.cash_infos):
-                    # 验证数据类型
-                    self.assertIsInstance(cash_info.currency, str, f"第{j+1}个现金信息的currency应该是字符串")
-                    self.assertIsInstance(cash_info.available_cash, Decimal, f"第{j+1}个现金信息的available_cash应该是Decimal类型")
-                    self.assertIsInstance(cash_info.withdraw_cash, Decimal, f"第{j+1}个现金信息的withdraw_cash应该是Decimal类型")
-                    self.assertIsInstance(cash_info.frozen_cash, Decimal, f"第{j+1}个现金信息的frozen_cash应该是Decimal类型")
-                    self.assertIsInstance(cash_info.settling_cash, Decimal, f"第{j+1}个现金信息的settling_cash应该是Decimal类型")
-                    
-                    logger.info(f"    {cash_info.currency}:")
-                    logger.info(f"      可用现金: {cash_info.available_cash}")
-                    logger.info(f"      可提现金: {cash_info.withdraw_cash}")
-                    logger.info(f"      冻结现金: {cash_info.frozen_cash}")
-                    logger.info(f"      待结算现金: {cash_info.settling_cash}")
+                    self._validate(cash_info, CASH_INFO_SCHEMA, f"第{j+1}个现金信息")
                 
-                # 冻结费用信息（如果有）
-                if hasattr(account_balance, 'frozen_transaction_fee') and account_balance.frozen_transaction_fee:
-                    logger.info(f"  冻结交易费用:")
-                    logger.info(f"    币种: {account_balance.frozen_transaction_fee.currency}")
-                    logger.info(f"    金额: {account_balance.frozen_transaction_fee.amount}")
-                
-                logger.info("-" * 30)
+                if VERBOSE:
+                    self._log_account_balance(i, account_balance)
+            
+            # 按币种筛选是确定性的，USD/CNH直接从全部账户中本地分组得到，
+            # 只保留HKD一次真实的服务端筛选请求
+            balances_by_currency = {}
+            for account_balance in all_balances:
+                balances_by_currency.setdefault(account_balance.currency, []).append(account_balance)
             
             # 测试2: 获取指定币种的账户资金 (HKD)
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试2: 获取港币(HKD)账户资金")
             
             hkd_balances = self.trader.get_account_balance(currency="HKD")
@@ -138,19 +373,20 @@ class TestTradeModule(unittest.TestCase):
                     self.assertEqual(account_balance.currency, "HKD", "筛选的账户币种应该是HKD")
                 
                 # 显示HKD账户详情
-                for i, account_balance in enumerate(hkd_balances):
-                    logger.info(f"HKD账户 {i+1}:")
-                    logger.info(f"  总现金: {account_balance.total_cash} HKD")
-                    logger.info(f"  购买力: {account_balance.buy_power} HKD")
-                    logger.info(f"  净资产: {account_balance.net_assets} HKD")
+                if VERBOSE:
+                    for i, account_balance in enumerate(hkd_balances):
+                        logger.info(f"HKD账户 {i+1}:")
+                        logger.info(f"  总现金: {account_balance.total_cash} HKD")
+                        logger.info(f"  购买力: {account_balance.buy_power} HKD")
+                        logger.info(f"  净资产: {account_balance.net_assets} HKD")
             else:
                 logger.info("未找到HKD账户资金信息")
             
             # 测试3: 获取指定币种的账户资金 (USD)
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试3: 获取美元(USD)账户资金")
             
-            usd_balances = self.trader.get_account_balance(currency="USD")
+            usd_balances = balances_by_currency.get("USD", [])
             
             self.assertIsNotNone(usd_balances, "USD账户资金信息不应该为None")
             self.assertIsInstance(usd_balances, list, "USD账户资金信息应该是列表类型")
@@ -163,19 +399,20 @@ class TestTradeModule(unittest.TestCase):
                     self.assertEqual(account_balance.currency, "USD", "筛选的账户币种应该是USD")
                 
                 # 显示USD账户详情
-                for i, account_balance in enumerate(usd_balances):
-                    logger.info(f"USD账户 {i+1}:")
-                    logger.info(f"  总现金: {account_balance.total_cash} USD")
-                    logger.info(f"  购买力: {account_balance.buy_power} USD")
-                    logger.info(f"  净资产: {account_balance.net_assets} USD")
+                if VERBOSE:
+                    for i, account_balance in enumerate(usd_balances):
+                        logger.info(f"USD账户 {i+1}:")
+                        logger.info(f"  总现金: {account_balance.total_cash} USD")
+                        logger.info(f"  购买力: {account_balance.buy_power} USD")
+                        logger.info(f"  净资产: {account_balance.net_assets} USD")
             else:
                 logger.info("未找到USD账户资金信息")
             
             # 测试4: 获取指定币种的账户资金 (CNH)
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试4: 获取人民币(CNH)账户资金")
             
-            cnh_balances = self.trader.get_account_balance(currency="CNH")
+            cnh_balances = balances_by_currency.get("CNH", [])
             
             self.assertIsNotNone(cnh_balances, "CNH账户资金信息不应该为None")
             self.assertIsInstance(cnh_balances, list, "CNH账户资金信息应该是列表类型")
@@ -188,38 +425,21 @@ class TestTradeModule(unittest.TestCase):
                     self.assertEqual(account_balance.currency, "CNH", "筛选的账户币种应该是CNH")
                 
                 # 显示CNH账户详情
-                for i, account_balance in enumerate(cnh_balances):
-                    logger.info(f"CNH账户 {i+1}:")
-                    logger.info(f"  总现金: {account_balance.total_cash} CNH")
-                    logger.info(f"  购买力: {account_balance.buy_power} CNH")
-                    logger.info(f"  净资产: {account_balance.net_assets} CNH")
+                if VERBOSE:
+                    for i, account_balance in enumerate(cnh_balances):
+                        logger.info(f"CNH账户 {i+1}:")
+                        logger.info(f"  总现金: {account_balance.total_cash} CNH")
+                        logger.info(f"  购买力: {account_balance.buy_power} CNH")
+                        logger.info(f"  净资产: {account_balance.net_assets} CNH")
             else:
                 logger.info("未找到CNH账户资金信息")
             
             # 汇总测试结果
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("账户资金汇总:")
             
-            # 统计不同币种的账户数量
-            currency_stats = {}
-            total_net_assets = {}
-            
-            for account_balance in all_balances:
-                currency = account_balance.currency
-                currency_stats[currency] = currency_stats.get(currency, 0) + 1
-                
-                # 累计净资产
-                if currency not in total_net_assets:
-                    total_net_assets[currency] = Decimal('0')
-                total_net_assets[currency] += account_balance.net_assets
-            
-            logger.info("币种分布:")
-            for currency, count in currency_stats.items():
-                logger.info(f"  {currency}: {count} 个账户")
-            
-            logger.info("各币种净资产总计:")
-            for currency, net_assets in total_net_assets.items():
-                logger.info(f"  {currency}: {net_assets}")
+            # 汇总统计只在INFO日志实际输出时才计算
+            logger.opt(lazy=True).info("{}", lambda: _summarize_account_balances(all_balances))
             
             logger.success("=== 账户资金信息获取测试完成 ===")
             
@@ -233,7 +453,7 @@ class TestTradeModule(unittest.TestCase):
         
         try:
             # 测试1: 获取所有股票持仓
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试1: 获取所有股票持仓")
             
             all_positions = self.trader.get_stock_positions()
@@ -250,8 +470,7 @@ class TestTradeModule(unittest.TestCase):
                     logger.info(f"账户 {i+1}:")
                     
                     # 验证数据类型
-                    self.assertIsInstance(account_position.account_channel, str, f"第{i+1}个账户的account_channel应该是字符串")
-                    self.assertIsInstance(account_position.positions, list, f"第{i+1}个账户的positions应该是列表")
+                    self._validate(account_position, STOCK_POSITION_CHANNEL_SCHEMA, f"第{i+1}个账户")
                     
                     account_type = account_position.account_channel
                     stock_count = len(account_position.positions)
@@ -265,15 +484,13 @@ class TestTradeModule(unittest.TestCase):
                         
                         for j, stock_info in enumerate(account_position.positions):
                             # 验证数据类型
-                            self.assertIsInstance(stock_info.symbol, str, f"第{j+1}只股票的symbol应该是字符串")
-                            self.assertIsInstance(stock_info.symbol_name, str, f"第{j+1}只股票的symbol_name应该是字符串")
-                            self.assertIsInstance(stock_info.quantity, Decimal, f"第{j+1}只股票的quantity应该是Decimal类型")
-                            self.assertIsInstance(stock_info.available_quantity, Decimal, f"第{j+1}只股票的available_quantity应该是Decimal类型")
-                            self.assertIsInstance(stock_info.currency, str, f"第{j+1}只股票的currency应该是字符串")
-                            self.assertIsInstance(stock_info.cost_price, Decimal, f"第{j+1}只股票的cost_price应该是Decimal类型")
+                            self._validate(stock_info, STOCK_POSITION_SCHEMA, f"第{j+1}只股票")
+                            
+                            if not VERBOSE:
+                                continue
                             
                             logger.info(f"    {j+1}. {stock_info.symbol} ({stock_info.symbol_name})")
-                            logger.info(f"       市场: {str(stock_info.market)}")
+                            logger.info(f"       市场: {get_market_name(stock_info.market)}")
                             logger.info(f"       持仓数量: {stock_info.quantity}")
                             logger.info(f"       可用数量: {stock_info.available_quantity}")
                             logger.info(f"       币种: {stock_info.currency}")
@@ -290,16 +507,18 @@ class TestTradeModule(unittest.TestCase):
                 logger.info("当前无股票持仓")
             
             # 测试2: 获取指定股票的持仓（如果有持仓的话）
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试2: 获取指定股票的持仓")
             
             # 先从全部持仓中找一些股票代码用于测试
             test_symbols = []
+            seen_symbols = set()
             if all_positions:
                 for account_position in all_positions:
                     if account_position.positions:
                         for stock_info in account_position.positions[:2]:  # 最多取前2只股票
-                            if stock_info.symbol not in test_symbols:
+                            if stock_info.symbol not in seen_symbols:
+                                seen_symbols.add(stock_info.symbol)
                                 test_symbols.append(stock_info.symbol)
             
             if test_symbols:
@@ -317,17 +536,18 @@ class TestTradeModule(unittest.TestCase):
                     for account_position in specific_positions:
                         if account_position.positions:
                             for stock_info in account_position.positions:
-                                self.assertIn(stock_info.symbol, test_symbols, 
+                                self.assertIn(stock_info.symbol, seen_symbols, 
                                             f"返回的股票{stock_info.symbol}应该在指定列表中")
-                                logger.info(f"  ✓ {stock_info.symbol} ({stock_info.symbol_name}): "
-                                          f"持仓{stock_info.quantity}股")
+                                if VERBOSE:
+                                    logger.info(f"  ✓ {stock_info.symbol} ({stock_info.symbol_name}): "
+                                              f"持仓{stock_info.quantity}股")
                 else:
                     logger.info("指定的股票当前无持仓")
             else:
                 logger.info("无法获取测试用的股票代码，跳过指定股票测试")
             
             # 测试3: 测试不存在的股票代码
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试3: 获取不存在的股票持仓")
             
             non_exist_positions = self.trader.get_stock_positions(symbols=["TEST.XX"])
@@ -349,37 +569,12 @@ class TestTradeModule(unittest.TestCase):
             logger.info("✓ 正确处理了不存在的股票代码")
             
             # 汇总测试结果
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("股票持仓汇总:")
             
             if all_positions:
-                # 统计持仓信息
-                total_stocks = 0
-                market_stats = {}
-                currency_stats = {}
-                
-                for account_position in all_positions:
-                    if account_position.positions:
-                        for stock_info in account_position.positions:
-                            total_stocks += 1
-                            
-                            # 统计市场分布 (Market是枚举类型，转换为字符串)
-                            market = str(stock_info.market)
-                            market_stats[market] = market_stats.get(market, 0) + 1
-                            
-                            # 统计币种分布
-                            currency = stock_info.currency
-                            currency_stats[currency] = currency_stats.get(currency, 0) + 1
-                
-                logger.info(f"总持仓股票数: {total_stocks}")
-                
-                logger.info("市场分布:")
-                for market, count in market_stats.items():
-                    logger.info(f"  {market}: {count} 只股票")
-                
-                logger.info("币种分布:")
-                for currency, count in currency_stats.items():
-                    logger.info(f"  {currency}: {count} 只股票")
+                # 汇总统计只在INFO日志实际输出时才计算
+                logger.opt(lazy=True).info("{}", lambda: _summarize_stock_positions(all_positions))
             else:
                 logger.info("当前无股票持仓")
             
@@ -395,7 +590,7 @@ class TestTradeModule(unittest.TestCase):
 
         try:
             # 测试1: 获取最近7天的资金流水
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试1: 获取最近7天的资金流水")
 
             end_time = datetime.now()
@@ -416,16 +611,14 @@ class TestTradeModule(unittest.TestCase):
                 logger.info(f"✓ 成功获取资金流水信息，共{len(cash_flows)}条记录")
 
                 # 验证资金流水数据结构
-                for i, flow in enumerate(cash_flows[:5]):  # 只验证前5条
-                    logger.info(f"流水记录 {i+1}:")
-
+                for i, flow in enumerate(islice(cash_flows, 5)):  # 只验证前5条
                     # 验证数据类型
-                    self.assertIsInstance(flow.transaction_flow_name, str, f"第{i+1}条流水的transaction_flow_name应该是字符串")
-                    self.assertIsNotNone(flow.direction, f"第{i+1}条流水的direction不应该为None")
-                    self.assertIsNotNone(flow.business_type, f"第{i+1}条流水的business_type不应该为None")
-                    self.assertIsInstance(flow.balance, Decimal, f"第{i+1}条流水的balance应该是Decimal类型")
-                    self.assertIsInstance(flow.currency, str, f"第{i+1}条流水的currency应该是字符串")
-                    self.assertIsNotNone(flow.business_time, f"第{i+1}条流水的business_time不应该为None")
+                    self._validate(flow, CASH_FLOW_SCHEMA, f"第{i+1}条流水")
+
+                    if not VERBOSE:
+                        continue
+
+                    logger.info(f"流水记录 {i+1}:")
 
                     # 基础信息
                     direction_desc = "流入" if "In" in str(flow.direction) else "流出"
@@ -451,7 +644,7 @@ class TestTradeModule(unittest.TestCase):
                 logger.info("最近7天无资金流水记录")
 
             # 测试2: 获取指定类别的资金流水（现金类）
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("测试2: 获取现金类资金流水")
 
             cash_flows_cash = self.trader.get_cash_flow(
@@ -472,63 +665,39 @@ class TestTradeModule(unittest.TestCase):
                     self.assertIn("Cash", business_type_str, "筛选的资金流水类别应该是现金")
 
                 # 显示前3条现金流水详情
-                for i, flow in enumerate(cash_flows_cash[:3]):
-                    direction_desc = "流入" if flow.direction == 2 else "流出"
-                    logger.info(f"{i+1}. {flow.transaction_flow_name}: {flow.balance} {flow.currency} ({direction_desc})")
+                if VERBOSE:
+                    for i, flow in enumerate(cash_flows_cash[:3]):
+                        direction_desc = "流入" if flow.direction == 2 else "流出"
+                        logger.info(f"{i+1}. {flow.transaction_flow_name}: {flow.balance} {flow.currency} ({direction_desc})")
             else:
                 logger.info("无现金类资金流水记录")
 
             # 测试3: 测试分页功能
-            logger.info("=" * 50)
-            logger.info("测试3: 测试分页功能（每页最多10条）")
-
-            cash_flows_page1 = self.trader.get_cash_flow(
-                start_at=start_time,
-                end_at=end_time,
-                page=1,
-                size=10
-            )
-
-            self.assertIsNotNone(cash_flows_page1, "分页查询结果不应该为None")
-            self.assertIsInstance(cash_flows_page1, list, "分页查询结果应该是列表类型")
+            logger.info(SEP)
+            logger.info(f"测试3: 测试分页功能（每页最多{CASH_FLOW_PAGE_SIZE}条，最多{CASH_FLOW_MAX_PAGES}页）")
+
+            # 校验当前页时下一页已经在后台请求，不足一页说明已经到最后一页
+            page_kwargs = {'start_at': start_time, 'end_at': end_time, 'size': CASH_FLOW_PAGE_SIZE}
+            for page, page_flows in enumerate(_prefetch_pages(self.trader.get_cash_flow, page_kwargs, CASH_FLOW_MAX_PAGES), start=1):
+                self.assertIsNotNone(page_flows, "分页查询结果不应该为None")
+                self.assertIsInstance(page_flows, list, "分页查询结果应该是列表类型")
+                self.assertLessEqual(len(page_flows), CASH_FLOW_PAGE_SIZE, f"第{page}页的记录数不应该超过每页数量")
+
+                if len(page_flows) > 0:
+                    logger.info(f"✓ 第{page}页返回{len(page_flows)}条记录")
+                else:
+                    logger.info(f"第{page}页无记录")
 
-            if len(cash_flows_page1) > 0:
-                logger.info(f"✓ 第1页返回{len(cash_flows_page1)}条记录")
-            else:
-                logger.info("第1页无记录")
+                if len(page_flows) < CASH_FLOW_PAGE_SIZE:
+                    break
 
             # 汇总测试结果
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("资金流水汇总:")
 
             if cash_flows:
-                # 统计流水信息
-                inflow_count = sum(1 for flow in cash_flows if flow.direction == 2)
-                outflow_count = sum(1 for flow in cash_flows if flow.direction == 1)
-
-                logger.info(f"总流水记录数: {len(cash_flows)}")
-                logger.info(f"资金流入记录: {inflow_count} 条")
-                logger.info(f"资金流出记录: {outflow_count} 条")
-
-                # 统计币种分布
-                currency_stats = {}
-                for flow in cash_flows:
-                    currency = flow.currency
-                    currency_stats[currency] = currency_stats.get(currency, 0) + 1
-
-                logger.info("币种分布:")
-                for currency, count in currency_stats.items():
-                    logger.info(f"  {currency}: {count} 条流水")
-
-                # 统计资金类别分布
-                business_type_stats = {}
-                for flow in cash_flows:
-                    business_type_desc = get_balance_type_desc(flow.business_type)
-                    business_type_stats[business_type_desc] = business_type_stats.get(business_type_desc, 0) + 1
-
-                logger.info("资金类别分布:")
-                for business_type, count in business_type_stats.items():
-                    logger.info(f"  {business_type}: {count} 条流水")
+                # 汇总统计只在INFO日志实际输出时才计算
+                logger.opt(lazy=True).info("{}", lambda: _summarize_cash_flows(cash_flows))
             else:
                 logger.info("查询时间范围内无资金流水记录")
 
@@ -539,6 +708,8 @@ class TestTradeModule(unittest.TestCase):
             logger.warning("请确保配置了正确的LongPort API环境变量和交易权限")
             self.fail(f"获取资金流水信息时发生异常: {e}")
 
+    # 涉及真实下单，并行运行时 (pytest -n --dist loadgroup) 所有订单测试固定在同一个 worker 上串行执行
+    @pytest.mark.xdist_group("trade_orders")
     def test_order_operations(self):
         """测试订单操作的完整生命周期"""
         logger.info("=== 测试订单操作生命周期 ===")
@@ -554,12 +725,12 @@ class TestTradeModule(unittest.TestCase):
         
         try:
             # 第1步：提交订单
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("第1步: 提交测试订单")
-            logger.info(f"股票: {test_symbol}")
-            logger.info(f"方向: 买入")
-            logger.info(f"数量: {test_quantity}股")
-            logger.info(f"价格: {test_price} USD")
+            logger.info("股票: {}", test_symbol)
+            logger.info("方向: 买入")
+            logger.info("数量: {}股", test_quantity)
+            logger.info("价格: {} USD", test_price)
             
             order_id = self.trader.submit_order(
                 symbol=test_symbol,
@@ -575,14 +746,24 @@ class TestTradeModule(unittest.TestCase):
             self.assertIsInstance(order_id, str, "订单ID应该是字符串类型")
             self.assertTrue(len(order_id) > 0, "订单ID不应该为空")
             
-            logger.info(f"✓ 订单提交成功，订单ID: {order_id}")
+            logger.info("✓ 订单提交成功，订单ID: {}", order_id)
+            
+            # 第2、3步的查询都是只读的且互不依赖，订单提交后用asyncio.gather并发发出，
+            # 总耗时取决于最慢的一次请求而不是所有请求之和
+            async def fetch_order_views():
+                return await asyncio.gather(
+                    self.trader.get_order_detail_async(order_id),
+                    self.trader.get_today_orders_async(),
+                    self.trader.get_today_orders_async(symbol=test_symbol),
+                    self.trader.get_today_orders_async(order_id=order_id),
+                )
+            
+            order_detail, all_today_orders, symbol_orders, id_orders = asyncio.run(fetch_order_views())
             
             # 第2步：获取订单详情
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("第2步: 获取订单详情")
             
-            order_detail = self.trader.get_order_detail(order_id)
-            
             self.assertIsNotNone(order_detail, "订单详情不应该为None")
             self.assertEqual(order_detail.order_id, order_id, "订单ID应该匹配")
             self.assertEqual(order_detail.symbol, test_symbol, "股票代码应该匹配")
@@ -590,61 +771,48 @@ class TestTradeModule(unittest.TestCase):
             self.assertEqual(order_detail.quantity, test_quantity, "订单数量应该匹配")
             self.assertEqual(Decimal(order_detail.price), test_price, "订单价格应该匹配")
             
-            logger.info(f"✓ 订单详情获取成功")
-            logger.info(f"  订单ID: {order_detail.order_id}")
-            logger.info(f"  股票: {order_detail.symbol} ({order_detail.stock_name})")
-            logger.info(f"  状态: {order_detail.status}")
-            logger.info(f"  方向: {order_detail.side}")
-            logger.info(f"  数量: {order_detail.quantity}")
-            logger.info(f"  价格: {order_detail.price}")
-            logger.info(f"  订单类型: {order_detail.order_type}")
-            logger.info(f"  提交时间: {order_detail.submitted_at}")
+            logger.info("✓ 订单详情获取成功")
+            logger.info("  订单ID: {}", order_detail.order_id)
+            logger.info("  股票: {} ({})", order_detail.symbol, order_detail.stock_name)
+            logger.info("  状态: {}", order_detail.status)
+            logger.info("  方向: {}", order_detail.side)
+            logger.info("  数量: {}", order_detail.quantity)
+            logger.info("  价格: {}", order_detail.price)
+            logger.info("  订单类型: {}", order_detail.order_type)
+            logger.info("  提交时间: {}", order_detail.submitted_at)
             
             # 第3步：获取当日订单（应该包含刚才提交的订单）
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("第3步: 获取当日订单")
             
-            # 获取所有当日订单
-            all_today_orders = self.trader.get_today_orders()
+            # 验证所有当日订单
             self.assertIsNotNone(all_today_orders, "当日订单列表不应该为None")
             self.assertIsInstance(all_today_orders, list, "当日订单应该是列表类型")
             
-            # 验证我们的订单在列表中
-            found_order = False
-            for order in all_today_orders:
-                if order.order_id == order_id:
-                    found_order = True
-                    logger.info(f"✓ 在当日订单中找到测试订单: {order.order_id}")
-                    break
-            
+            # 验证我们的订单在列表中，只检查一次，找到即停止，不必为整个列表建集合
+            found_order = any(order.order_id == order_id for order in all_today_orders)
             self.assertTrue(found_order, "应该在当日订单中找到刚提交的订单")
+            logger.info("✓ 在当日订单中找到测试订单: {}", order_id)
             
             # 测试按股票代码筛选
-            symbol_orders = self.trader.get_today_orders(symbol=test_symbol)
             self.assertIsNotNone(symbol_orders, "按股票筛选的订单列表不应该为None")
             
-            found_in_symbol_orders = False
-            for order in symbol_orders:
-                if order.order_id == order_id:
-                    found_in_symbol_orders = True
-                    break
-            
+            found_in_symbol_orders = any(order.order_id == order_id for order in symbol_orders)
             self.assertTrue(found_in_symbol_orders, "应该在按股票筛选的订单中找到测试订单")
-            logger.info(f"✓ 按股票代码筛选测试通过")
+            logger.info("✓ 按股票代码筛选测试通过")
             
             # 测试按订单ID筛选
-            id_orders = self.trader.get_today_orders(order_id=order_id)
             self.assertIsNotNone(id_orders, "按订单ID筛选的结果不应该为None")
             self.assertTrue(len(id_orders) > 0, "按订单ID筛选应该有结果")
             self.assertEqual(id_orders[0].order_id, order_id, "筛选结果的订单ID应该匹配")
             
-            logger.info(f"✓ 按订单ID筛选测试通过")
+            logger.info("✓ 按订单ID筛选测试通过")
             
             # 第4步：修改订单
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("第4步: 修改订单")
-            logger.info(f"将数量从 {test_quantity} 修改为 {modified_quantity}")
-            logger.info(f"将价格从 {test_price} 修改为 {modified_price}")
+            logger.info("将数量从 {} 修改为 {}", test_quantity, modified_quantity)
+            logger.info("将价格从 {} 修改为 {}", test_price, modified_price)
             
             self.trader.replace_order(
                 order_id=order_id,
@@ -653,55 +821,52 @@ class TestTradeModule(unittest.TestCase):
                 remark="修改后的测试订单"
             )
             
-            logger.info(f"✓ 订单修改成功")
+            logger.info("✓ 订单修改成功")
             
-            # 验证修改结果
-            import time
-            time.sleep(1)  # 等待1秒让修改生效
-            
-            modified_order_detail = self.trader.get_order_detail(order_id)
+            # 验证修改结果，数量更新后立即返回，最多等待 ORDER_UPDATE_TIMEOUT 秒
+            modified_order_detail = self._wait_for_order(
+                order_id, lambda detail: detail.quantity == modified_quantity)
             
             # 注意：修改订单后，数量和价格可能会更新
-            logger.info(f"修改后的订单详情:")
-            logger.info(f"  数量: {modified_order_detail.quantity}")
-            logger.info(f"  价格: {modified_order_detail.price}")
-            logger.info(f"  状态: {modified_order_detail.status}")
+            logger.info("修改后的订单详情:")
+            logger.info("  数量: {}", modified_order_detail.quantity)
+            logger.info("  价格: {}", modified_order_detail.price)
+            logger.info("  状态: {}", modified_order_detail.status)
             
             # 第5步：取消订单
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("第5步: 取消订单")
             
             self.trader.cancel_order(order_id)
-            logger.info(f"✓ 订单取消成功，订单ID: {order_id}")
-            
-            # 验证取消结果
-            time.sleep(1)  # 等待1秒让取消生效
+            logger.info("✓ 订单取消成功，订单ID: {}", order_id)
             
-            cancelled_order_detail = self.trader.get_order_detail(order_id)
-            logger.info(f"取消后的订单状态: {cancelled_order_detail.status}")
+            # 验证取消结果，进入撤单状态后立即返回，最多等待 ORDER_UPDATE_TIMEOUT 秒
+            cancelled_order_detail = self._wait_for_order(
+                order_id, lambda detail: str(detail.status) in CANCELLED_ORDER_STATUSES)
+            logger.info("取消后的订单状态: {}", cancelled_order_detail.status)
             
             # 测试总结
-            logger.info("=" * 50)
+            logger.info(SEP)
             logger.info("订单操作测试总结:")
-            logger.info(f"✓ 订单提交: 成功 (ID: {order_id})")
-            logger.info(f"✓ 订单详情获取: 成功")
-            logger.info(f"✓ 当日订单查询: 成功")
-            logger.info(f"✓ 订单修改: 成功")
-            logger.info(f"✓ 订单取消: 成功")
+            logger.info("✓ 订单提交: 成功 (ID: {})", order_id)
+            logger.info("✓ 订单详情获取: 成功")
+            logger.info("✓ 当日订单查询: 成功")
+            logger.info("✓ 订单修改: 成功")
+            logger.info("✓ 订单取消: 成功")
             
             logger.success("=== 订单操作生命周期测试完成 ===")
             
         except Exception as e:
-            logger.error(f"订单操作测试失败: {e}")
+            logger.error("订单操作测试失败: {}", e)
             
             # 如果出现异常且订单已创建，尝试取消订单
             if order_id:
                 try:
-                    logger.warning(f"尝试清理测试订单: {order_id}")
+                    logger.warning("尝试清理测试订单: {}", order_id)
                     self.trader.cancel_order(order_id)
-                    logger.info(f"✓ 测试订单已清理: {order_id}")
+                    logger.info("✓ 测试订单已清理: {}", order_id)
                 except Exception as cleanup_e:
-                    logger.error(f"清理测试订单失败: {cleanup_e}")
+                    logger.error("清理测试订单失败: {}", cleanup_e)
             
             logger.warning("请确保配置了正确的LongPort API环境变量和交易权限")
             logger.warning("注意：此测试涉及真实的订单操作，请在模拟环境中进行")
@@ -709,18 +874,52 @@ class TestTradeModule(unittest.TestCase):
 
 
 if __name__ == "__main__":
-    # 创建测试套件
-    suite = unittest.TestSuite()
+    # 要运行的测试从测试类中自动发现；订单测试涉及真实下单，默认不运行，设置 AT_TEST_ORDERS=1 时才加入
+    test_names = [
+        name for name in unittest.TestLoader().getTestCaseNames(TestTradeModule)
+        if name != 'test_order_operations' or os.getenv('AT_TEST_ORDERS') == '1'
+    ]
     
-    # 添加测试用例
-    suite.addTest(TestTradeModule('test_get_account_balance'))
-    suite.addTest(TestTradeModule('test_get_stock_positions'))
-    suite.addTest(TestTradeModule('test_get_cash_flow'))
-    # suite.addTest(TestTradeModule('test_order_operations'))
+    def run_test(name: str) -> unittest.TestResult:
+        """在独立的结果对象中运行单个测试，避免多线程同时写同一个结果"""
+        test_result = unittest.TestResult()
+        TestTradeModule(name).run(test_result)
+        return test_result
     
-    # 运行测试
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
+    if os.getenv('AT_TEST_FAILFAST') == '1':
+        # 调试时按顺序运行，第一个失败后立即停止，省去后续测试的网络等待
+        suite = unittest.TestSuite(TestTradeModule(name) for name in test_names)
+        result = unittest.TextTestRunner(verbosity=2, failfast=True).run(suite)
+    else:
+        # 各查询测试只读且以网络等待为主，并发运行，总耗时取决于最慢的一个测试；
+        # 订单测试会真实下单和撤单，不与查询当日订单的测试同时运行，等线程池结束后单独运行。
+        # 直接运行测试实例不会触发类级别的初始化，这里手动调用，所有线程共用同一个交易接口。
+        # 未开启真实接口测试时各测试会被标记为跳过，不创建交易连接
+        read_names = [name for name in test_names if name != 'test_order_operations']
+        order_names = [name for name in test_names if name == 'test_order_operations']
+        if LIVE_TESTS:
+            TestTradeModule.setUpClass()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(read_names))) as executor:
+                test_results = list(executor.map(run_test, read_names))
+            test_results.extend(run_test(name) for name in order_names)
+        finally:
+            if LIVE_TESTS:
+                TestTradeModule.tearDownClass()
+        
+        # 合并各测试的结果，逐个测试的状态在所有线程结束后统一输出
+        result = unittest.TestResult()
+        for name, test_result in zip(read_names + order_names, test_results):
+            if test_result.skipped:
+                logger.info("{} ... skipped", name)
+            elif test_result.wasSuccessful():
+                logger.info("{} ... ok", name)
+            else:
+                logger.error("{} ... FAIL", name)
+            result.testsRun += test_result.testsRun
+            result.failures.extend(test_result.failures)
+            result.errors.extend(test_result.errors)
+            result.skipped.extend(test_result.skipped)
     
     # 打印测试总结
     print("\n" + "="*50)
@@ -728,7 +927,7 @@ if __name__ == "__main__":
     print(f"- 运行测试数: {result.testsRun}")
     print(f"- 失败数: {len(result.failures)}")
     print(f"- 错误数: {len(result.errors)}")
-    print(f"- 跳过数: {len(result.skipped) if hasattr(result, 'skipped') else 0}")
+    print(f"- 跳过数: {len(result.skipped)}")
     
     if result.failures:
         print("\n失败的测试:")
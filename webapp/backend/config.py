@@ -6,67 +6,132 @@
 """
 
 import os
+from dataclasses import dataclass, field
+from enum import Enum
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
 
 
+# 项目根目录，导入时解析一次
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+class Period(str, Enum):
+    """时间周期代码，成员与对应的字符串相等，可以直接作为字符串使用"""
+    D7 = "7d"
+    M1 = "1m"
+    M6 = "6m"
+    Y1 = "1y"
+    ALL = "all"
+    MTD = "mtd"
+    YTD = "ytd"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Benchmark(str, Enum):
+    """基准指数代码，成员与对应的字符串相等，可以直接作为字符串使用"""
+    SP500 = "sp500"
+    NASDAQ100 = "nasdaq100"
+    CSI300 = "csi300"
+    A500 = "a500"
+    HSTECH = "hstech"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+# 基准指数配置 - 使用长桥(LongPort) API 数据源
+# 代码格式: ticker.region (US/HK/SH/SZ)
+_LONGPORT_BENCHMARKS: Mapping[Benchmark, Mapping[str, str]] = MappingProxyType({
+    # 美股指数
+    Benchmark.SP500: MappingProxyType({"symbol": "SPY.US", "name": "标普500"}),  # 使用 SPY ETF 作为 S&P 500 代理
+    Benchmark.NASDAQ100: MappingProxyType({"symbol": "QQQ.US", "name": "纳斯达克100"}),  # 使用 QQQ ETF 作为 Nasdaq 100 代理
+    # A股指数
+    Benchmark.CSI300: MappingProxyType({"symbol": "000300.SH", "name": "沪深300"}),
+    Benchmark.A500: MappingProxyType({"symbol": "000510.SH", "name": "中证A500"}),
+    # 港股指数
+    Benchmark.HSTECH: MappingProxyType({"symbol": "HSTECH.HK", "name": "恒生科技"}),
+})
+
+# 时间周期配置 (period_code -> days, None 表示特殊处理)
+# 键是 str 枚举，用枚举成员或普通字符串查找都可以
+_PERIOD_DAYS: Mapping[Period, int | None] = MappingProxyType({
+    Period.D7: 7,
+    Period.M1: 30,
+    Period.M6: 180,
+    Period.Y1: 365,
+    Period.ALL: None,   # 全部数据
+    Period.MTD: None,   # 本月至今
+    Period.YTD: None,   # 本年至今
+})
+
+
+@dataclass(frozen=True, slots=True)
 class Config:
-    """应用配置"""
+    """应用配置，实例只读，所有值在导入时计算一次"""
     
     # 项目根目录
-    PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+    PROJECT_ROOT: Path = _PROJECT_ROOT
     
     # 缓存目录
-    CACHE_DIR = PROJECT_ROOT / "caches"
+    CACHE_DIR: Path = _PROJECT_ROOT / "caches"
     
     # 账户数据文件
-    ACCOUNT_CSV_PATH = CACHE_DIR / "account.csv"
+    ACCOUNT_CSV_PATH: Path = _PROJECT_ROOT / "caches" / "account.csv"
     
     # API 配置
-    API_PREFIX = "/api"
-    API_TITLE = "AwesomeTrader Analytics API"
-    API_VERSION = "1.0.0"
+    API_PREFIX: str = "/api"
+    API_TITLE: str = "AwesomeTrader Analytics API"
+    API_VERSION: str = "1.0.0"
     
-    # 基准指数配置 - 使用长桥(LongPort) API 数据源
-    # 代码格式: ticker.region (US/HK/SH/SZ)
-    LONGPORT_BENCHMARKS: Dict[str, Dict] = {
-        # 美股指数
-        "sp500": {"symbol": "SPY.US", "name": "标普500"},  # 使用 SPY ETF 作为 S&P 500 代理
-        "nasdaq100": {"symbol": "QQQ.US", "name": "纳斯达克100"},  # 使用 QQQ ETF 作为 Nasdaq 100 代理
-        # A股指数
-        "csi300": {"symbol": "000300.SH", "name": "沪深300"},
-        "a500": {"symbol": "000510.SH", "name": "中证A500"},
-        # 港股指数
-        "hstech": {"symbol": "HSTECH.HK", "name": "恒生科技"},
-    }
+    # 基准指数配置（只读映射）
+    LONGPORT_BENCHMARKS: Mapping[Benchmark, Mapping[str, str]] = field(default_factory=lambda: _LONGPORT_BENCHMARKS)
     
-    # 时间周期配置 (period_code -> days, None 表示特殊处理)
-    PERIOD_DAYS: Dict[str, int | None] = {
-        "7d": 7,
-        "1m": 30,
-        "6m": 180,
-        "1y": 365,
-        "all": None,   # 全部数据
-        "mtd": None,   # 本月至今
-        "ytd": None,   # 本年至今
-    }
+    # 时间周期配置（只读映射）
+    PERIOD_DAYS: Mapping[Period, int | None] = field(default_factory=lambda: _PERIOD_DAYS)
     
     # 无风险利率 (年化，用于夏普比率等计算)
-    RISK_FREE_RATE = 0.036  # 3.6%
+    RISK_FREE_RATE: float = 0.036  # 3.6%
     
     # ============== 认证配置 ==============
-    # JWT 配置（必须通过环境变量设置）
-    SECRET_KEY = os.environ["SECRET_KEY"]  # JWT 签名密钥，必须设置
-    ALGORITHM = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 天
+    # JWT 配置（启用认证时必须通过环境变量设置）
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "")  # JWT 签名密钥
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 天
     
-    # 用户配置（必须通过环境变量设置）
+    # 用户配置（启用认证时必须通过环境变量设置）
     # 密码哈希使用 bcrypt，可以通过命令生成: python -c "from passlib.context import CryptContext; print(CryptContext(schemes=['bcrypt']).hash('your-password'))"
-    DEFAULT_USERNAME = os.environ["ADMIN_USERNAME"]  # 管理员用户名，必须设置
-    DEFAULT_PASSWORD_HASH = os.environ["ADMIN_PASSWORD_HASH"]  # 管理员密码哈希，必须设置
+    DEFAULT_USERNAME: str = os.getenv("ADMIN_USERNAME", "")  # 管理员用户名
+    DEFAULT_PASSWORD_HASH: str = os.getenv("ADMIN_PASSWORD_HASH", "")  # 管理员密码哈希
+    
+    # 允许跨域访问的前端地址，多个地址用逗号分隔
+    # 前端开发服务器通过代理同源访问 /api，只有前端单独部署在其他域名时才需要配置
+    ALLOWED_ORIGINS: tuple[str, ...] = tuple(
+        origin.strip()
+        for origin in os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
+        if origin.strip()
+    )
     
     # 是否启用 API 认证保护 (默认启用)
-    AUTH_ENABLED = os.getenv("AUTH_ENABLED", "true").lower() in ("true", "1", "yes")
+    AUTH_ENABLED: bool = os.getenv("AUTH_ENABLED", "true").lower() in ("true", "1", "yes")
+    
+    def __post_init__(self):
+        """创建配置时一次性检查认证所需的环境变量，缺少时列出所有缺失项"""
+        if not self.AUTH_ENABLED:
+            return
+        required = {
+            "SECRET_KEY": self.SECRET_KEY,
+            "ADMIN_USERNAME": self.DEFAULT_USERNAME,
+            "ADMIN_PASSWORD_HASH": self.DEFAULT_PASSWORD_HASH,
+        }
+        missing_vars = [name for name, value in required.items() if not value]
+        if missing_vars:
+            raise RuntimeError(
+                f"缺少必需的环境变量: {', '.join(missing_vars)}，"
+                f"请参考文档配置环境变量: docs/webapp_setup.md，或设置 AUTH_ENABLED=false 关闭认证"
+            )
 
 
 config = Config()
@@ -5,12 +5,60 @@
 FastAPI 应用入口
 """
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
 from .config import config
 from .routes import analytics_router, auth_router
+from .services.data_loader import data_loader
+
+
+async def _warm_up(state) -> None:
+    """
+    后台预加载账户数据，完成后（无论成功与否）放行分析接口
+    
+    :param state: app.state，加载结束后设置其中的 data_ready 事件
+    """
+    try:
+        # 读取 CSV 是阻塞操作，放到线程中执行，不占用事件循环
+        await asyncio.to_thread(data_loader.load_account_data)
+        logger.success("账户数据预加载成功")
+        
+        # 启动文件监控，自动检测 account.csv 变更
+        data_loader.start_file_watcher()
+    except Exception as e:
+        logger.warning(f"账户数据预加载失败: {e}")
+    finally:
+        state.data_ready.set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时在后台预加载数据，健康检查无需等待加载完成"""
+    logger.info(f"启动 {config.API_TITLE} v{config.API_VERSION}")
+    logger.info(f"API 文档: http://localhost:8000/docs")
+    
+    app.state.data_ready = asyncio.Event()
+    warm_up_task = asyncio.create_task(_warm_up(app.state))
+    
+    yield
+    
+    logger.info("关闭服务...")
+    
+    # 预加载尚未完成时取消，避免关闭后再启动文件监控
+    warm_up_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warm_up_task
+    
+    # 停止文件监控
+    try:
+        data_loader.stop_file_watcher()
+    except Exception as e:
+        logger.warning(f"停止文件监控失败: {e}")
 
 
 # 创建 FastAPI 应用
@@ -20,15 +68,18 @@ app = FastAPI(
     description="AwesomeTrader 账户收益分析 API - 提供收益率、风控指标、基准对比等分析功能",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS 中间件配置
+# 只允许配置的前端域名，并让浏览器缓存预检结果一天，避免每个接口都多一次 OPTIONS 请求
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # 生产环境应该限制具体域名
+    allow_origins=config.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
 
@@ -53,37 +104,6 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.on_event("startup")
-async def startup_event():
-    """应用启动事件"""
-    logger.info(f"启动 {config.API_TITLE} v{config.API_VERSION}")
-    logger.info(f"API 文档: http://localhost:8000/docs")
-    
-    # 预加载账户数据
-    try:
-        from .services.data_loader import data_loader
-        data_loader.load_account_data()
-        logger.success("账户数据预加载成功")
-        
-        # 启动文件监控，自动检测 account.csv 变更
-        data_loader.start_file_watcher()
-    except Exception as e:
-        logger.warning(f"账户数据预加载失败: {e}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """应用关闭事件"""
-    logger.info("关闭服务...")
-    
-    # 停止文件监控
-    try:
-        from .services.data_loader import data_loader
-        data_loader.stop_file_watcher()
-    except Exception as e:
-        logger.warning(f"停止文件监控失败: {e}")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -7,15 +7,17 @@ Pydantic 数据模型定义
 
 from datetime import date
 from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from ..config import Period, Benchmark
 
 
 # ==================== 请求参数 ====================
 
 class AnalyticsQuery(BaseModel):
     """分析查询参数"""
-    period: str = Field(default="all", description="时间周期: 7d, 1m, 6m, 1y, all, mtd, ytd")
-    benchmark: str = Field(default="sp500", description="基准指数: sp500, nasdaq100, csi300, a500, hstech")
+    period: Period = Field(default=Period.ALL, description="时间周期: 7d, 1m, 6m, 1y, all, mtd, ytd")
+    benchmark: Benchmark = Field(default=Benchmark.SP500, description="基准指数: sp500, nasdaq100, csi300, a500, hstech")
 
 
 # ==================== 响应模型 ====================
@@ -142,22 +144,12 @@ class MonthlyReturn(BaseModel):
     return_value: float
 
 
-class TimeSeriesPoint(BaseModel):
-    """时间序列数据点"""
-    date: str
-    value: float
-
-
-class DrawdownPoint(BaseModel):
-    """回撤序列数据点"""
-    date: str
-    drawdown: float
-
-
-class ReturnPoint(BaseModel):
-    """收益率序列数据点"""
-    date: str
-    return_value: float = Field(..., alias="return")
+class TimeSeriesColumns(BaseModel):
+    """时间序列（列式存储：日期与数值两个等长数组）"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
+    dates: List[str]
+    values: List[float]
 
 
 class OverviewResponse(BaseModel):
@@ -177,7 +169,7 @@ class ReturnsResponse(BaseModel):
     """收益分析响应"""
     period: str
     metrics: ReturnMetrics
-    daily_returns: List[Dict[str, str | float]] = Field(..., description="每日收益率序列")
+    daily_returns: TimeSeriesColumns = Field(..., description="每日收益率序列")
 
 
 class RiskResponse(BaseModel):
@@ -198,7 +190,7 @@ class DrawdownResponse(BaseModel):
     period: str
     current_drawdown: float
     max_drawdown: float
-    drawdown_series: List[Dict[str, str | float]] = Field(..., description="回撤序列")
+    drawdown_series: TimeSeriesColumns = Field(..., description="回撤序列")
     worst_drawdowns: List[DrawdownInfo] = Field(..., description="最差回撤列表")
 
 
@@ -212,8 +204,8 @@ class MonthlyResponse(BaseModel):
 class EquityCurveResponse(BaseModel):
     """资产曲线响应"""
     period: str
-    portfolio: List[Dict[str, str | float]] = Field(..., description="组合资产曲线")
-    benchmark: Optional[List[Dict[str, str | float]]] = Field(None, description="基准资产曲线")
+    portfolio: TimeSeriesColumns = Field(..., description="组合资产曲线")
+    benchmark: Optional[TimeSeriesColumns] = Field(None, description="基准资产曲线")
 
 
 class ErrorResponse(BaseModel):
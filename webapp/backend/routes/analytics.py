@@ -5,10 +5,11 @@
 分析 API 路由
 """
 
+import json
 from typing import Optional, Annotated
 
 import numpy as np
-from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi import APIRouter, Query, HTTPException, Depends, Request, Response
 from loguru import logger
 
 
@@ -37,60 +38,71 @@ from ..models.schemas import (
     RiskMetrics,
     BenchmarkComparison,
     BenchmarkMetrics,
-    DrawdownInfo,
     MonthlyReturn,
 )
 from ..services.analytics_service import analytics_service
 from ..services.data_loader import data_loader
-from ..config import config
+from ..config import config, Period, Benchmark
 
 
-# 根据配置决定是否添加认证依赖
-if config.AUTH_ENABLED:
-    router = APIRouter(
-        prefix="/analytics",
-        tags=["Analytics"],
-        dependencies=[Depends(get_current_user)]  # 所有路由需要认证
+async def wait_data_ready(request: Request) -> None:
+    """等待启动时的账户数据预加载完成，未经 lifespan 启动（如直接调用）时不等待"""
+    data_ready = getattr(request.app.state, "data_ready", None)
+    if data_ready is not None:
+        await data_ready.wait()
+
+
+# 客户端在 Accept 中声明该类型时，序列接口（回撤、资产曲线）返回 Arrow IPC 流，否则返回 JSON
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def wants_arrow(request: Request) -> bool:
+    """客户端是否接受 Arrow IPC 流格式的响应"""
+    return ARROW_STREAM_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def arrow_response(columns: dict, metadata: dict) -> Response:
+    """
+    构造 Arrow IPC 流响应
+    
+    :param columns: 列名到等长列表的映射
+    :param metadata: 写入 schema 元数据的标量信息
+    :return: Arrow IPC 流响应
+    """
+    return Response(
+        content=analytics_service.to_arrow_stream(columns, metadata),
+        media_type=ARROW_STREAM_MEDIA_TYPE,
     )
-else:
-    router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 
-def validate_period(period: str) -> str:
-    """验证时间周期参数"""
-    valid_periods = list(config.PERIOD_DAYS.keys())
-    if period not in valid_periods:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"无效的时间周期: {period}，可选: {valid_periods}"
-        )
-    return period
+# 根据配置决定是否添加认证依赖，认证通过后再等待数据就绪
+dependencies = [Depends(wait_data_ready)]
+if config.AUTH_ENABLED:
+    dependencies.insert(0, Depends(get_current_user))  # 所有路由需要认证
 
+router = APIRouter(prefix="/analytics", tags=["Analytics"], dependencies=dependencies)
 
-def validate_benchmark(benchmark: str) -> str:
-    """验证基准参数"""
-    valid_benchmarks = list(config.LONGPORT_BENCHMARKS.keys())
-    if benchmark not in valid_benchmarks:
-        raise HTTPException(
-            status_code=400,
-            detail=f"无效的基准: {benchmark}，可选: {valid_benchmarks}"
-        )
-    return benchmark
+# 含可选字段的响应设置 response_model_exclude_none=True，值为 None 的字段（如未选择基准时的 benchmark）
+# 不写入响应，前端读取到 undefined 与 null 的处理一致。
+# 序列数据量大的接口（收益、回撤、资产曲线）直接返回字典，由 response_model 校验并序列化一次，
+# 不在路由中先构造模型实例，避免 FastAPI 再把模型转回字典重新校验。
+# 各接口的计算结果通过 analytics_service.cached 按查询参数和账户数据版本缓存
+# 计算接口都是同步的 pandas/quantstats 运算，声明为普通 def，由 FastAPI 放到线程池执行，不阻塞事件循环
 
 
-@router.get("/overview", response_model=OverviewResponse, summary="获取总览数据")
-async def get_overview(
-    period: str = Query(default="all", description="时间周期: 7d, 1m, 6m, 1y, all, mtd, ytd"),
-    benchmark: str = Query(default="sp500", description="基准指数: sp500, nasdaq100, csi300, a500, hstech")
+@router.get("/overview", response_model=OverviewResponse, response_model_exclude_none=True, summary="获取总览数据")
+def get_overview(
+    period: Period = Query(default=Period.ALL, description="时间周期: 7d, 1m, 6m, 1y, all, mtd, ytd"),
+    benchmark: Benchmark = Query(default=Benchmark.SP500, description="基准指数: sp500, nasdaq100, csi300, a500, hstech")
 ):
     """
     获取账户分析总览数据，包含收益指标、风险指标和基准对比
     """
     try:
-        period = validate_period(period)
-        benchmark = validate_benchmark(benchmark)
-        
-        result = analytics_service.get_overview(period, benchmark)
+        result = analytics_service.cached(
+            ("overview", period, benchmark),
+            lambda: analytics_service.get_overview(period, benchmark),
+        )
         
         return OverviewResponse(
             period=result["period"],
@@ -111,16 +123,14 @@ async def get_overview(
         raise HTTPException(status_code=500, detail=f"服务器错误: {e}")
 
 
-@router.get("/returns", response_model=ReturnsResponse, summary="获取收益分析")
-async def get_returns(
-    period: str = Query(default="all", description="时间周期")
+@router.get("/returns", response_model=ReturnsResponse, response_model_exclude_none=True, summary="获取收益分析")
+def get_returns(
+    period: Period = Query(default=Period.ALL, description="时间周期")
 ):
     """
     获取收益分析数据，包含收益指标和每日收益率序列
     """
-    try:
-        period = validate_period(period)
-        
+    def build():
         returns = data_loader.get_filtered_returns(period)
         
         if returns.empty:
@@ -128,16 +138,16 @@ async def get_returns(
         
         metrics = analytics_service.calculate_return_metrics(returns)
         
-        daily_returns = [
-            {"date": d.strftime("%Y-%m-%d"), "return": safe_float(v)}
-            for d, v in returns.items()
-        ]
+        daily_returns = analytics_service.to_columns(returns)
         
-        return ReturnsResponse(
-            period=period,
-            metrics=ReturnMetrics(**metrics),
-            daily_returns=daily_returns,
-        )
+        return {
+            "period": period,
+            "metrics": metrics,
+            "daily_returns": daily_returns,
+        }
+    
+    try:
+        return analytics_service.cached(("returns", period), build)
         
     except HTTPException:
         raise
@@ -146,22 +156,23 @@ async def get_returns(
         raise HTTPException(status_code=500, detail=f"服务器错误: {e}")
 
 
-@router.get("/risk", response_model=RiskResponse, summary="获取风险指标")
-async def get_risk(
-    period: str = Query(default="all", description="时间周期")
+@router.get("/risk", response_model=RiskResponse, response_model_exclude_none=True, summary="获取风险指标")
+def get_risk(
+    period: Period = Query(default=Period.ALL, description="时间周期")
 ):
     """
     获取风险指标数据
     """
-    try:
-        period = validate_period(period)
-        
+    def build():
         returns = data_loader.get_filtered_returns(period)
         
         if returns.empty:
             raise HTTPException(status_code=404, detail="没有找到数据")
         
-        metrics = analytics_service.calculate_risk_metrics(returns)
+        return analytics_service.calculate_risk_metrics(returns)
+    
+    try:
+        metrics = analytics_service.cached(("risk", period), build)
         
         return RiskResponse(
             period=period,
@@ -176,30 +187,24 @@ async def get_risk(
 
 
 @router.get("/benchmark", response_model=BenchmarkResponse, summary="获取基准对比")
-async def get_benchmark(
-    period: str = Query(default="all", description="时间周期"),
-    benchmark: Optional[str] = Query(default=None, description="指定单个基准，不指定则返回所有基准")
+def get_benchmark(
+    period: Period = Query(default=Period.ALL, description="时间周期"),
+    benchmark: Optional[Benchmark] = Query(default=None, description="指定单个基准，不指定则返回所有基准")
 ):
     """
     获取与基准指数的对比数据
     """
-    try:
-        period = validate_period(period)
-        
+    def build():
         returns = data_loader.get_filtered_returns(period)
         
         if returns.empty:
             raise HTTPException(status_code=404, detail="没有找到数据")
         
-        portfolio_return = safe_float((1 + returns).prod() - 1)
-        
-        if benchmark:
-            benchmark = validate_benchmark(benchmark)
-            comparison = analytics_service.calculate_benchmark_comparison(returns, benchmark)
-            benchmarks = [BenchmarkComparison(**comparison)] if comparison else []
-        else:
-            all_comparisons = analytics_service.calculate_all_benchmarks(returns)
-            benchmarks = [BenchmarkComparison(**c) for c in all_comparisons]
+        return analytics_service.calculate_benchmarks_with_portfolio(returns, benchmark)
+    
+    try:
+        portfolio_return, comparisons = analytics_service.cached(("benchmark", period, benchmark), build)
+        benchmarks = [BenchmarkComparison(**c) for c in comparisons]
         
         return BenchmarkResponse(
             period=period,
@@ -214,17 +219,19 @@ async def get_benchmark(
         raise HTTPException(status_code=500, detail=f"服务器错误: {e}")
 
 
-@router.get("/drawdown", response_model=DrawdownResponse, summary="获取回撤分析")
-async def get_drawdown(
-    period: str = Query(default="all", description="时间周期"),
+@router.get("/drawdown", response_model=DrawdownResponse, response_model_exclude_none=True, summary="获取回撤分析")
+def get_drawdown(
+    request: Request,
+    period: Period = Query(default=Period.ALL, description="时间周期"),
     top_n: int = Query(default=5, ge=1, le=20, description="返回最差的N次回撤")
 ):
     """
     获取回撤分析数据
+    
+    请求头 Accept 包含 application/vnd.apache.arrow.stream 时返回 Arrow IPC 流：
+    列为 date、drawdown，其余字段 JSON 编码后放在 schema 元数据中
     """
-    try:
-        period = validate_period(period)
-        
+    def build():
         returns = data_loader.get_filtered_returns(period)
         
         if returns.empty:
@@ -240,22 +247,29 @@ async def get_drawdown(
         max_drawdown = safe_float(drawdown_series.min()) if not drawdown_series.empty else 0.0
         
         # 回撤序列数据
-        dd_data = [
-            {"date": d.strftime("%Y-%m-%d"), "drawdown": safe_float(v)}
-            for d, v in drawdown_series.items()
-        ]
+        dd_data = analytics_service.to_columns(drawdown_series)
         
         # 最差回撤列表
         worst_drawdowns = analytics_service.get_worst_drawdowns(returns, top_n)
-        worst_dd_models = [DrawdownInfo(**dd) for dd in worst_drawdowns]
         
-        return DrawdownResponse(
-            period=period,
-            current_drawdown=current_drawdown,
-            max_drawdown=max_drawdown,
-            drawdown_series=dd_data,
-            worst_drawdowns=worst_dd_models,
-        )
+        return {
+            "period": period,
+            "current_drawdown": current_drawdown,
+            "max_drawdown": max_drawdown,
+            "drawdown_series": dd_data,
+            "worst_drawdowns": worst_drawdowns,
+        }
+    
+    try:
+        result = analytics_service.cached(("drawdown", period, top_n), build)
+        
+        if wants_arrow(request):
+            series = result["drawdown_series"]
+            return arrow_response(
+                {"date": series["dates"], "drawdown": series["values"]},
+                {key: result[key] for key in ("period", "current_drawdown", "max_drawdown", "worst_drawdowns")},
+            )
+        return result
         
     except HTTPException:
         raise
@@ -265,15 +279,13 @@ async def get_drawdown(
 
 
 @router.get("/monthly", response_model=MonthlyResponse, summary="获取月度收益")
-async def get_monthly(
-    period: str = Query(default="all", description="时间周期")
+def get_monthly(
+    period: Period = Query(default=Period.ALL, description="时间周期")
 ):
     """
     获取月度和年度收益数据
     """
-    try:
-        period = validate_period(period)
-        
+    def build():
         returns = data_loader.get_filtered_returns(period)
         
         if returns.empty:
@@ -281,6 +293,10 @@ async def get_monthly(
         
         monthly_returns = analytics_service.calculate_monthly_returns(returns)
         yearly_returns = analytics_service.calculate_yearly_returns(returns)
+        return monthly_returns, yearly_returns
+    
+    try:
+        monthly_returns, yearly_returns = analytics_service.cached(("monthly", period), build)
         
         return MonthlyResponse(
             period=period,
@@ -295,23 +311,32 @@ async def get_monthly(
         raise HTTPException(status_code=500, detail=f"服务器错误: {e}")
 
 
-@router.get("/equity-curve", response_model=EquityCurveResponse, summary="获取资产曲线")
-async def get_equity_curve(
-    period: str = Query(default="all", description="时间周期"),
-    benchmark: Optional[str] = Query(default=None, description="基准指数（可选）")
+@router.get("/equity-curve", response_model=EquityCurveResponse, response_model_exclude_none=True, summary="获取资产曲线")
+def get_equity_curve(
+    request: Request,
+    period: Period = Query(default=Period.ALL, description="时间周期"),
+    benchmark: Optional[Benchmark] = Query(default=None, description="基准指数（可选）")
 ):
     """
     获取资产曲线数据，用于绑图展示
+    
+    请求头 Accept 包含 application/vnd.apache.arrow.stream 时返回 Arrow IPC 流：
+    列为 date、portfolio，指定基准时增加按日期对齐的 benchmark 列（缺失为空值）
     """
     try:
-        period = validate_period(period)
-        
-        if benchmark:
-            benchmark = validate_benchmark(benchmark)
-        
-        result = analytics_service.get_equity_curve_data(period, benchmark)
+        result = analytics_service.cached(
+            ("equity-curve", period, benchmark),
+            lambda: analytics_service.get_equity_curve_data(period, benchmark),
+        )
         
-        return EquityCurveResponse(**result)
+        if wants_arrow(request):
+            portfolio = result["portfolio"]
+            columns = {"date": portfolio["dates"], "portfolio": portfolio["values"]}
+            if result["benchmark"]:
+                bench = dict(zip(result["benchmark"]["dates"], result["benchmark"]["values"]))
+                columns["benchmark"] = [bench.get(d) for d in portfolio["dates"]]
+            return arrow_response(columns, {"period": result["period"]})
+        return result
         
     except HTTPException:
         raise
@@ -320,31 +345,44 @@ async def get_equity_curve(
         raise HTTPException(status_code=500, detail=f"服务器错误: {e}")
 
 
+# 时间周期和基准指数选项是静态配置，导入时序列化一次，请求时直接返回字节，浏览器可以缓存一天
+_STATIC_CACHE_CONTROL = "private, max-age=86400"
+
+_PERIODS_JSON = json.dumps({
+    "periods": [
+        {"code": "7d", "name": "7天"},
+        {"code": "1m", "name": "1个月"},
+        {"code": "6m", "name": "6个月"},
+        {"code": "1y", "name": "1年"},
+        {"code": "all", "name": "全部"},
+        {"code": "mtd", "name": "本月"},
+        {"code": "ytd", "name": "本年"},
+    ]
+}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+_BENCHMARKS_JSON = json.dumps({
+    "benchmarks": [
+        {"code": code.value, "name": info["name"], "symbol": info["symbol"]}
+        for code, info in config.LONGPORT_BENCHMARKS.items()
+    ]
+}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 @router.get("/periods", summary="获取可用的时间周期")
 async def get_periods():
     """获取所有可用的时间周期选项"""
-    return {
-        "periods": [
-            {"code": "7d", "name": "7天"},
-            {"code": "1m", "name": "1个月"},
-            {"code": "6m", "name": "6个月"},
-            {"code": "1y", "name": "1年"},
-            {"code": "all", "name": "全部"},
-            {"code": "mtd", "name": "本月"},
-            {"code": "ytd", "name": "本年"},
-        ]
-    }
+    return Response(
+        content=_PERIODS_JSON,
+        media_type="application/json",
+        headers={"Cache-Control": _STATIC_CACHE_CONTROL},
+    )
 
 
 @router.get("/benchmarks", summary="获取可用的基准指数")
 async def get_benchmarks():
     """获取所有可用的基准指数选项（数据源：LongPort）"""
-    benchmarks = []
-    for code, info in config.LONGPORT_BENCHMARKS.items():
-        benchmarks.append({
-            "code": code,
-            "name": info["name"],
-            "symbol": info["symbol"],
-        })
-    return {"benchmarks": benchmarks}
-
+    return Response(
+        content=_BENCHMARKS_JSON,
+        media_type="application/json",
+        headers={"Cache-Control": _STATIC_CACHE_CONTROL},
+    )
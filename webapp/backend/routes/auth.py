@@ -40,9 +40,10 @@ class LoginResponse(BaseModel):
 
 
 # ============== API 端点 ==============
+# 登录接口需要做 bcrypt 校验（刻意耗时的 CPU 运算），声明为普通 def，由 FastAPI 放到线程池执行
 
 @router.post("/login", response_model=LoginResponse)
-async def login(request: LoginRequest):
+def login(request: LoginRequest):
     """
     用户登录
     
@@ -74,7 +75,7 @@ async def login(request: LoginRequest):
 
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
     """
     OAuth2 兼容的登录端点（用于 Swagger UI 测试）
     
@@ -5,11 +5,15 @@
 分析服务 - 使用 quantstats 计算风控指标
 """
 
+import json
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import quantstats as qs
-from datetime import date
-from typing import Dict, List, Optional, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any, Tuple, TypeVar
 from loguru import logger
 
 from ..config import config
@@ -17,6 +21,16 @@ from .data_loader import data_loader
 from .benchmark_service import benchmark_service
 
 
+T = TypeVar("T")
+
+# 基准指标中默认值不为 0 的项（无效值时使用）
+_BENCHMARK_METRIC_DEFAULTS: Dict[str, float] = {
+    "beta": 1.0,
+    "up_capture": 1.0,
+    "down_capture": 1.0,
+}
+
+
 class AnalyticsService:
     """分析服务 - 核心指标计算"""
     
@@ -24,6 +38,56 @@ class AnalyticsService:
         """初始化分析服务"""
         self.data_loader = data_loader
         self.benchmark_service = benchmark_service
+        # 接口结果缓存，键中带有账户数据版本号，account.csv 重新加载后旧结果自动失效；
+        # 基准数据会随行情更新，另设较短的过期时间
+        self._result_cache: Dict[Tuple, Tuple[datetime, Any]] = {}
+        self._result_cache_ttl = timedelta(seconds=60)
+        self._result_cache_size = 128
+        self._result_cache_lock = threading.Lock()
+        # 正在计算中的结果，相同缓存键的并发请求等待同一次计算，不重复计算
+        self._inflight: Dict[Tuple, Future] = {}
+    
+    def cached(self, key: Tuple, compute: Callable[[], T]) -> T:
+        """
+        按缓存键和账户数据版本缓存计算结果，缓存的结果只读，调用方不能修改。
+        同一缓存键同时只计算一次，并发的相同请求等待并共享这次计算的结果或异常
+        
+        :param key: 缓存键（接口名和查询参数）
+        :param compute: 缓存未命中时调用的计算函数，抛出异常时不缓存
+        :return: 计算结果
+        """
+        # 计算前读取版本号，计算期间数据重新加载时结果记在旧版本下，不会被当作新数据返回
+        cache_key = (*key, self.data_loader.version)
+        now = datetime.now()
+        with self._result_cache_lock:
+            entry = self._result_cache.get(cache_key)
+            if entry is not None and now - entry[0] < self._result_cache_ttl:
+                return entry[1]
+            
+            inflight = self._inflight.get(cache_key)
+            if inflight is None:
+                future = self._inflight[cache_key] = Future()
+        
+        if inflight is not None:
+            return inflight.result()
+        
+        try:
+            result = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            with self._result_cache_lock:
+                del self._inflight[cache_key]
+            raise
+        
+        future.set_result(result)
+        with self._result_cache_lock:
+            del self._inflight[cache_key]
+            # 重新插入到末尾，超出容量时淘汰最早写入的结果
+            self._result_cache.pop(cache_key, None)
+            self._result_cache[cache_key] = (now, result)
+            while len(self._result_cache) > self._result_cache_size:
+                self._result_cache.pop(next(iter(self._result_cache)))
+        return result
     
     @staticmethod
     def _safe_float(value, default=0.0) -> float:
@@ -44,6 +108,72 @@ class AnalyticsService:
         except (ValueError, TypeError):
             return default
     
+    @classmethod
+    def _safe_float_many(
+        cls,
+        values: Dict[str, Any],
+        defaults: Optional[Dict[str, float]] = None
+    ) -> Dict[str, float]:
+        """
+        批量安全转换为 float：一次转换为 float64 数组，nan 和 inf 替换为各自的默认值
+        
+        :param values: 指标名到原始值的映射
+        :param defaults: 指标名到默认值的映射，未列出的指标默认值为 0.0
+        :return: 指标名到安全 float 值的映射，顺序与输入一致
+        """
+        names = list(values)
+        try:
+            arr = np.asarray(list(values.values()), dtype=float)
+        except (ValueError, TypeError):
+            # 存在无法整体转换的值时逐个转换，无效值先记为 nan，下面统一替换
+            arr = np.array([cls._safe_float(v, np.nan) for v in values.values()])
+        
+        fallback = 0.0
+        if defaults:
+            fallback = np.array([defaults.get(name, 0.0) for name in names])
+        return dict(zip(names, np.where(np.isfinite(arr), arr, fallback).tolist()))
+    
+    @staticmethod
+    def to_arrow_stream(columns: Dict[str, List], metadata: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        将列式数据编码为 Arrow IPC 流，date 列为 date32 类型，其余列为 float64（允许空值）
+        
+        :param columns: 列名到等长列表的映射
+        :param metadata: 附加的标量信息，逐项 JSON 编码后写入 schema 元数据
+        :return: Arrow IPC 流字节
+        """
+        arrays = {
+            name: pa.array(values, type=pa.string()).cast(pa.date32()) if name == "date"
+            else pa.array(values, type=pa.float64())
+            for name, values in columns.items()
+        }
+        table = pa.table(arrays)
+        if metadata:
+            table = table.replace_schema_metadata({
+                key: json.dumps(value, default=str, ensure_ascii=False)
+                for key, value in metadata.items()
+            })
+        
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    
+    @staticmethod
+    def to_columns(series: pd.Series, default: float = 0.0) -> Dict[str, List]:
+        """
+        将日期索引的序列转换为列式结构 {dates, values}，nan 和 inf 替换为默认值
+        
+        :param series: 以日期为索引的数值序列
+        :param default: 当值无效时的默认值
+        :return: 包含 dates 和 values 两个等长列表的字典
+        """
+        values = series.to_numpy(dtype=float)
+        return {
+            "dates": series.index.strftime("%Y-%m-%d").tolist(),
+            "values": np.where(np.isfinite(values), values, default).tolist(),
+        }
+    
     # ==================== 收益指标 ====================
     
     def calculate_return_metrics(self, returns: pd.Series) -> Dict[str, Any]:
@@ -410,8 +540,10 @@ class AnalyticsService:
             benchmark_upi = benchmark_annualized / benchmark_ulcer_index if benchmark_ulcer_index > 0 else 0
             
             # ========== 对比指标 ==========
-            alpha = qs.stats.greeks(portfolio_returns, benchmark_returns).get('alpha', 0.0)
-            beta = qs.stats.greeks(portfolio_returns, benchmark_returns).get('beta', 1.0)
+            # alpha 和 beta 来自同一次回归，只计算一次
+            greeks = qs.stats.greeks(portfolio_returns, benchmark_returns)
+            alpha = greeks.get('alpha', 0.0)
+            beta = greeks.get('beta', 1.0)
             correlation = portfolio_returns.corr(benchmark_returns)
             info_ratio = qs.stats.information_ratio(portfolio_returns, benchmark_returns)
             excess_returns = portfolio_returns - benchmark_returns
@@ -419,51 +551,57 @@ class AnalyticsService:
             up_capture = self._calculate_capture_ratio(portfolio_returns, benchmark_returns, up=True)
             down_capture = self._calculate_capture_ratio(portfolio_returns, benchmark_returns, up=False)
             
-            return {
-                "benchmark_name": self.benchmark_service.get_benchmark_name(benchmark),
+            # 原始指标先收集为字典，再一次性批量转换为 float，nan 和 inf 替换为默认值
+            raw_metrics = {
                 # 收益指标
-                "benchmark_return": self._safe_float(benchmark_cumulative),
-                "benchmark_cagr": self._safe_float(benchmark_annualized),
-                "benchmark_daily_mean": self._safe_float(benchmark_daily_mean),
-                "benchmark_daily_std": self._safe_float(benchmark_daily_std),
-                "benchmark_best_day": self._safe_float(benchmark_best_day),
-                "benchmark_worst_day": self._safe_float(benchmark_worst_day),
-                "benchmark_win_rate": self._safe_float(benchmark_win_rate),
-                "benchmark_avg_win": self._safe_float(benchmark_avg_win),
-                "benchmark_avg_loss": self._safe_float(benchmark_avg_loss),
-                "benchmark_profit_factor": self._safe_float(benchmark_profit_factor),
-                "benchmark_payoff_ratio": self._safe_float(benchmark_payoff_ratio),
-                "benchmark_expectancy": self._safe_float(benchmark_expectancy),
-                "benchmark_geometric_mean": self._safe_float(benchmark_geometric_mean),
-                "benchmark_expected_monthly": self._safe_float(benchmark_expected_monthly),
-                "benchmark_expected_yearly": self._safe_float(benchmark_expected_yearly),
+                "benchmark_return": benchmark_cumulative,
+                "benchmark_cagr": benchmark_annualized,
+                "benchmark_daily_mean": benchmark_daily_mean,
+                "benchmark_daily_std": benchmark_daily_std,
+                "benchmark_best_day": benchmark_best_day,
+                "benchmark_worst_day": benchmark_worst_day,
+                "benchmark_win_rate": benchmark_win_rate,
+                "benchmark_avg_win": benchmark_avg_win,
+                "benchmark_avg_loss": benchmark_avg_loss,
+                "benchmark_profit_factor": benchmark_profit_factor,
+                "benchmark_payoff_ratio": benchmark_payoff_ratio,
+                "benchmark_expectancy": benchmark_expectancy,
+                "benchmark_geometric_mean": benchmark_geometric_mean,
+                "benchmark_expected_monthly": benchmark_expected_monthly,
+                "benchmark_expected_yearly": benchmark_expected_yearly,
                 # 风险指标
-                "benchmark_volatility": self._safe_float(benchmark_volatility),
-                "benchmark_max_drawdown": self._safe_float(benchmark_max_drawdown),
-                "benchmark_sharpe": self._safe_float(benchmark_sharpe),
-                "benchmark_sortino": self._safe_float(benchmark_sortino),
-                "benchmark_calmar": self._safe_float(benchmark_calmar),
-                "benchmark_var_95": self._safe_float(benchmark_var_95),
-                "benchmark_cvar_95": self._safe_float(benchmark_cvar_95),
-                "benchmark_skewness": self._safe_float(benchmark_skewness),
-                "benchmark_kurtosis": self._safe_float(benchmark_kurtosis),
-                "benchmark_ulcer_index": self._safe_float(benchmark_ulcer_index),
-                "benchmark_tail_ratio": self._safe_float(benchmark_tail_ratio),
-                "benchmark_kelly_criterion": self._safe_float(benchmark_kelly),
-                "benchmark_omega_ratio": self._safe_float(benchmark_omega),
-                "benchmark_gain_to_pain_ratio": self._safe_float(benchmark_gain_to_pain),
-                "benchmark_common_sense_ratio": self._safe_float(benchmark_common_sense),
-                "benchmark_recovery_factor": self._safe_float(benchmark_recovery),
-                "benchmark_risk_return_ratio": self._safe_float(benchmark_risk_return),
-                "benchmark_ulcer_performance_index": self._safe_float(benchmark_upi),
+                "benchmark_volatility": benchmark_volatility,
+                "benchmark_max_drawdown": benchmark_max_drawdown,
+                "benchmark_sharpe": benchmark_sharpe,
+                "benchmark_sortino": benchmark_sortino,
+                "benchmark_calmar": benchmark_calmar,
+                "benchmark_var_95": benchmark_var_95,
+                "benchmark_cvar_95": benchmark_cvar_95,
+                "benchmark_skewness": benchmark_skewness,
+                "benchmark_kurtosis": benchmark_kurtosis,
+                "benchmark_ulcer_index": benchmark_ulcer_index,
+                "benchmark_tail_ratio": benchmark_tail_ratio,
+                "benchmark_kelly_criterion": benchmark_kelly,
+                "benchmark_omega_ratio": benchmark_omega,
+                "benchmark_gain_to_pain_ratio": benchmark_gain_to_pain,
+                "benchmark_common_sense_ratio": benchmark_common_sense,
+                "benchmark_recovery_factor": benchmark_recovery,
+                "benchmark_risk_return_ratio": benchmark_risk_return,
+                "benchmark_ulcer_performance_index": benchmark_upi,
                 # 对比指标
-                "alpha": self._safe_float(alpha),
-                "beta": self._safe_float(beta, 1.0),
-                "correlation": self._safe_float(correlation),
-                "information_ratio": self._safe_float(info_ratio),
-                "tracking_error": self._safe_float(tracking_error),
-                "up_capture": self._safe_float(up_capture, 1.0),
-                "down_capture": self._safe_float(down_capture, 1.0),
+                "alpha": alpha,
+                "beta": beta,
+                "correlation": correlation,
+                "information_ratio": info_ratio,
+                "tracking_error": tracking_error,
+                "up_capture": up_capture,
+                "down_capture": down_capture,
+            }
+            
+            metrics = self._safe_float_many(raw_metrics, _BENCHMARK_METRIC_DEFAULTS)
+            return {
+                "benchmark_name": self.benchmark_service.get_benchmark_name(benchmark),
+                **metrics,
             }
             
         except Exception as e:
@@ -535,12 +673,35 @@ class AnalyticsService:
         :param returns: 组合收益率
         :return: 所有基准的对比指标列表
         """
-        results = []
-        for benchmark in config.LONGPORT_BENCHMARKS.keys():
+        # 各基准之间相互独立，耗时以拉取基准行情为主，并发计算，总耗时取决于最慢的一个基准
+        benchmarks = list(config.LONGPORT_BENCHMARKS.keys())
+        with ThreadPoolExecutor(max_workers=len(benchmarks)) as executor:
+            comparisons = executor.map(
+                lambda benchmark: self.calculate_benchmark_comparison(returns, benchmark),
+                benchmarks,
+            )
+            return [comparison for comparison in comparisons if comparison]
+    
+    def calculate_benchmarks_with_portfolio(
+        self,
+        returns: pd.Series,
+        benchmark: Optional[str] = None
+    ) -> Tuple[float, List[Dict[str, Any]]]:
+        """
+        计算组合累计收益率以及与基准的对比，供基准对比接口一次调用
+        
+        :param returns: 组合日收益率序列
+        :param benchmark: 基准代码，不指定时对比所有基准
+        :return: (组合累计收益率, 基准对比指标列表)
+        """
+        portfolio_return = self._safe_float(np.nanprod(1.0 + returns.to_numpy(dtype=float)) - 1.0)
+        
+        if benchmark:
             comparison = self.calculate_benchmark_comparison(returns, benchmark)
-            if comparison:
-                results.append(comparison)
-        return results
+            comparisons = [comparison] if comparison else []
+        else:
+            comparisons = self.calculate_all_benchmarks(returns)
+        return portfolio_return, comparisons
     
     # ==================== 回撤分析 ====================
     
@@ -724,15 +885,12 @@ class AnalyticsService:
         equity = self.data_loader.get_filtered_equity(period)
         
         if equity.empty:
-            return {"period": period, "portfolio": [], "benchmark": None}
+            return {"period": period, "portfolio": {"dates": [], "values": []}, "benchmark": None}
         
         # 归一化到起始值为 1
         portfolio_normalized = equity / equity.iloc[0]
         
-        portfolio_data = [
-            {"date": d.strftime("%Y-%m-%d"), "value": self._safe_float(v, 1.0)}
-            for d, v in portfolio_normalized.items()
-        ]
+        portfolio_data = self.to_columns(portfolio_normalized, 1.0)
         
         benchmark_data = None
         if benchmark:
@@ -742,10 +900,7 @@ class AnalyticsService:
             if not bench_returns.empty:
                 # 计算累计收益曲线
                 bench_cumulative = (1 + bench_returns).cumprod()
-                benchmark_data = [
-                    {"date": d.strftime("%Y-%m-%d"), "value": self._safe_float(v, 1.0)}
-                    for d, v in bench_cumulative.items()
-                ]
+                benchmark_data = self.to_columns(bench_cumulative, 1.0)
         
         return {
             "period": period,
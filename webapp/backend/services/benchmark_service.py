@@ -6,6 +6,7 @@
 """
 
 import pandas as pd
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 from loguru import logger
@@ -24,14 +25,17 @@ class BenchmarkService:
         self._cache: Dict[str, pd.Series] = {}
         self._cache_time: Dict[str, datetime] = {}
         self._cache_ttl = timedelta(hours=1)  # 缓存1小时
-        # 延迟初始化长桥 API
+        # 延迟初始化长桥 API，多个基准可能在不同线程中同时首次获取，加锁保证只创建一个实例
         self._longport_api = None
+        self._longport_api_lock = threading.Lock()
         
     def _get_longport_api(self):
         """获取长桥 API 实例（延迟初始化）"""
         if self._longport_api is None:
-            from awesometrader import LongPortQuotaAPI
-            self._longport_api = LongPortQuotaAPI()
+            with self._longport_api_lock:
+                if self._longport_api is None:
+                    from awesometrader import LongPortQuotaAPI
+                    self._longport_api = LongPortQuotaAPI()
         return self._longport_api
         
     def _is_cache_valid(self, cache_key: str) -> bool:
@@ -66,6 +66,7 @@ class DataLoader:
         self._returns: Optional[pd.Series] = None
         self._observer: Optional[Observer] = None
         self._lock = threading.Lock()  # 线程锁，保证数据一致性
+        self._version = 0  # 数据版本号，每次从文件加载后递增，供上层缓存判断失效
         
     def load_account_data(self, force_reload: bool = False) -> pd.DataFrame:
         """
@@ -87,6 +88,7 @@ class DataLoader:
                 df['total_assets'] = pd.to_numeric(df['total_assets'], errors='coerce')
                 
                 self._account_data = df
+                self._version += 1
                 # 强制重新加载时清除收益率缓存
                 if force_reload:
                     self._returns = None
@@ -98,6 +100,11 @@ class DataLoader:
                 logger.error(f"加载账户数据失败: {e}")
                 raise ValueError(f"无法加载账户数据: {e}")
     
+    @property
+    def version(self) -> int:
+        """当前账户数据的版本号，account.csv 重新加载后改变"""
+        return self._version
+    
     def get_returns(self, force_reload: bool = False) -> pd.Series:
         """
         获取日收益率序列
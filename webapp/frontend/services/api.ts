@@ -10,17 +10,23 @@ import {
 } from '../types';
 
 // 后端返回的原始格式
+// 时间序列为列式结构：dates 与 values 等长，按下标一一对应
+interface BackendTimeSeriesColumns {
+  dates: string[];
+  values: number[];
+}
+
 interface BackendEquityCurveResponse {
   period: string;
-  portfolio: { date: string; value: number }[];
-  benchmark: { date: string; value: number }[] | null;
+  portfolio: BackendTimeSeriesColumns;
+  benchmark: BackendTimeSeriesColumns | null;
 }
 
 interface BackendDrawdownResponse {
   period: string;
   current_drawdown: number;
   max_drawdown: number;
-  drawdown_series: { date: string; drawdown: number }[];
+  drawdown_series: BackendTimeSeriesColumns;
   worst_drawdowns: {
     start_date: string;
     end_date: string | null;
@@ -34,7 +40,7 @@ interface BackendDrawdownResponse {
 interface BackendReturnsResponse {
   period: string;
   metrics: any;
-  daily_returns: { date: string; return: number }[];
+  daily_returns: BackendTimeSeriesColumns;
 }
 
 async function fetchJson<T>(endpoint: string, params: Record<string, string> = {}): Promise<T> {
@@ -80,32 +86,38 @@ async function fetchJson<T>(endpoint: string, params: Record<string, string> = {
   }
 }
 
-// 转换 equity curve 数据格式：{ date, value }[] -> { [date]: value }[]
+// 列式序列 { dates, values } -> { [date]: value }[]
+function columnsToRecords(columns: BackendTimeSeriesColumns): Record<string, number>[] {
+  return columns.dates.map((date, i) => ({ [date]: columns.values[i] }));
+}
+
+// 转换 equity curve 数据格式：{ dates, values } -> { [date]: value }[]
 function transformEquityCurve(data: BackendEquityCurveResponse): EquityCurveResponse {
   return {
     period: data.period,
-    portfolio: data.portfolio.map(p => ({ [p.date]: p.value })),
-    benchmark: data.benchmark ? data.benchmark.map(b => ({ [b.date]: b.value })) : null,
+    portfolio: columnsToRecords(data.portfolio),
+    benchmark: data.benchmark ? columnsToRecords(data.benchmark) : null,
   };
 }
 
-// 转换 drawdown 数据格式：{ date, drawdown }[] -> { [date]: drawdown }[]
+// 转换 drawdown 数据格式：{ dates, values } -> { [date]: drawdown }[]
 function transformDrawdown(data: BackendDrawdownResponse): DrawdownResponse {
   return {
     period: data.period,
     current_drawdown: data.current_drawdown,
     max_drawdown: data.max_drawdown,
-    drawdown_series: data.drawdown_series.map(d => ({ [d.date]: d.drawdown })),
+    drawdown_series: columnsToRecords(data.drawdown_series),
     worst_drawdowns: data.worst_drawdowns,
   };
 }
 
-// 转换 returns 数据格式
+// 转换 returns 数据格式：{ dates, values } -> { date, return }[]
 function transformReturns(data: BackendReturnsResponse): ReturnsResponse {
+  const { dates, values } = data.daily_returns;
   return {
     period: data.period,
     metrics: data.metrics,
-    daily_returns: data.daily_returns.map(r => ({ date: r.date, return: r.return })),
+    daily_returns: dates.map((date, i) => ({ date, return: values[i] })),
   };
 }
 